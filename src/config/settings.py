@@ -4,43 +4,90 @@ Configuration settings and constants for the Miami real estate project.
 
 import re
 import os
-from typing import List, Pattern
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables once per process tree: the GUI spawns pipeline
+# steps as subprocesses that inherit the parent's environment, so children
+# can skip re-parsing the .env file
+if not os.environ.get("_MIAMI_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_MIAMI_DOTENV_LOADED"] = "1"
 
 # Base URLs
 ANYWHO_BASE = "https://www.anywho.com"
 ANYWHO_PEOPLE = f"{ANYWHO_BASE}/people"
 
-# Enhanced phone number regex patterns
-PHONE_PATTERNS: List[Pattern] = [
-    re.compile(r'\((\d{3})\)\s*(\d{3})-(\d{4})'),  # (305) 555-1234
-    re.compile(r'(\d{3})-(\d{3})-(\d{4})'),        # 305-555-1234
-    re.compile(r'(\d{3})\.(\d{3})\.(\d{4})'),      # 305.555.1234
-    re.compile(r'(\d{3})\s+(\d{3})\s+(\d{4})'),    # 305 555 1234
-    re.compile(r'(\d{10})'),                       # 3055551234
-]
+# Enhanced phone number regex: one alternation covering every accepted
+# format so extraction is a single pass over the text instead of five
+# separate pattern scans. Compiled lazily (PEP 562 __getattr__ below) so
+# processes that never extract phones skip the compile at import
+_PHONE_REGEX_SRC = (
+    r'\((\d{3})\)\s*(\d{3})-(\d{4})'    # (305) 555-1234
+    r'|(\d{3})-(\d{3})-(\d{4})'         # 305-555-1234
+    r'|(\d{3})\.(\d{3})\.(\d{4})'       # 305.555.1234
+    r'|(\d{3})\s+(\d{3})\s+(\d{4})'     # 305 555 1234
+    r'|(\d{10})'                        # 3055551234
+)
+
+# PHONE_SEARCH / PHONE_FINDITER are the pre-bound pattern methods: hot
+# loops call them directly and skip the per-call attribute lookup
+_LAZY_PHONE_ATTRS = frozenset({'PHONE_REGEX', 'PHONE_SEARCH', 'PHONE_FINDITER'})
+
+
+def __getattr__(name: str):
+    if name in _LAZY_PHONE_ATTRS:
+        regex = re.compile(_PHONE_REGEX_SRC)
+        g = globals()
+        g['PHONE_REGEX'] = regex
+        g['PHONE_SEARCH'] = regex.search
+        g['PHONE_FINDITER'] = regex.finditer
+        return g[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Default paths
 DEFAULT_CACHE_PATH = "data/cache/anywho_cache_enhanced.json"
+# URL-level cache of validators (ETag/Last-Modified) plus the candidates
+# parsed from each search URL, enabling conditional GETs on re-runs
+DEFAULT_URL_CACHE_PATH = "data/cache/anywho_url_cache.json"
 
 # Request settings
 DEFAULT_SLEEP_SEC = 1.0
 DEFAULT_REQUEST_TIMEOUT = 30
 
+# Host-wide rate limit for AnyWho lookups (token bucket: sustained
+# requests/second plus a small burst allowance shared by all workers)
+ANYWHO_RATE_PER_SEC = 1.0
+ANYWHO_RATE_BURST = 3.0
+
+# Cached no-result lookups stay valid this long before a re-run queries the
+# host again; positive results never expire
+NEGATIVE_CACHE_TTL_SEC = 7 * 24 * 3600
+
 # Default user agent (updated for 2024)
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 )
 
+# Advertise brotli first only when a decoder is actually importable:
+# promising "br" without one means urllib3 hands back an undecoded body if
+# the server takes us up on it. Brotli also compresses HTML noticeably
+# tighter than gzip, so it goes first whenever available.
+try:
+    import brotli as _brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    try:
+        import brotlicffi as _brotli  # noqa: F401
+        ACCEPT_ENCODING = "br, gzip, deflate"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
 # Enhanced default request headers with modern browser features
 DEFAULT_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
     "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Encoding": ACCEPT_ENCODING,
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
     "Sec-Fetch-Dest": "document",
@@ -54,8 +101,9 @@ DEFAULT_HEADERS = {
     "DNT": "1",
 }
 
-# Miami zip codes for location context scoring
-MIAMI_ZIP_CODES = [
+# Miami zip codes for location context scoring; frozenset so membership
+# tests in the scoring hot path are single hash lookups
+MIAMI_ZIP_CODES: frozenset = frozenset({
     '33101', '33102', '33109', '33125', '33126', '33127', '33128', '33129', '33130',
     '33131', '33132', '33133', '33134', '33135', '33136', '33137', '33138', '33139',
     '33140', '33141', '33142', '33143', '33144', '33145', '33146', '33147', '33150',
@@ -64,10 +112,11 @@ MIAMI_ZIP_CODES = [
     '33170', '33172', '33173', '33174', '33175', '33176', '33177', '33178', '33179',
     '33180', '33181', '33182', '33183', '33184', '33185', '33186', '33187', '33188',
     '33189', '33190', '33193', '33194', '33196', '33197', '33199'
-]
+})
 
-# Common first names for name format detection
-COMMON_FIRST_NAMES = {
+# Common first names for name format detection; frozen so membership is a
+# hash lookup and the container is interned once at module load
+COMMON_FIRST_NAMES: frozenset = frozenset({
     'JOHN', 'JAMES', 'MICHAEL', 'MARY', 'PATRICIA', 'LINDA', 'BARBARA',
     'ELIZABETH', 'JENNIFER', 'MARIA', 'SUSAN', 'MARGARET', 'DOROTHY',
     'LISA', 'NANCY', 'KAREN', 'BETTY', 'HELEN', 'SANDRA', 'DONNA',
@@ -75,7 +124,16 @@ COMMON_FIRST_NAMES = {
     'THOMAS', 'CHRISTOPHER', 'DANIEL', 'MATTHEW', 'ANTHONY', 'MARK',
     'DONALD', 'STEVEN', 'PAUL', 'ANDREW', 'JOSHUA', 'KENNETH', 'KEVIN',
     'BRIAN', 'GEORGE', 'TIMOTHY', 'RONALD', 'JASON', 'EDWARD', 'JACOB'
-}
+})
+
+
+def is_common_first_name(tok: str) -> bool:
+    """Check whether a token is a recognizably common first name.
+
+    Short-circuits on length before paying for the uppercase copy, so
+    initials and junk tokens never touch the frozenset.
+    """
+    return len(tok) >= 3 and tok.upper() in COMMON_FIRST_NAMES
 
 # Address parsing settings
-COMMON_STREET_WORDS = {'N', 'S', 'E', 'W', 'ST', 'AVE', 'BLVD', 'DR', 'RD', 'CT', 'LN', 'PL', 'WAY'}
+COMMON_STREET_WORDS: frozenset = frozenset({'N', 'S', 'E', 'W', 'ST', 'AVE', 'BLVD', 'DR', 'RD', 'CT', 'LN', 'PL', 'WAY'})
@@ -1,21 +1,30 @@
 from __future__ import annotations
 
+import json
+import os
+import queue
 import sys
-import threading
+import tempfile
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.scrolledtext import ScrolledText
 from pathlib import Path
 
+from src.config.doc_types import GUI_DOC_TYPE_OPTIONS
+
 from .runner import ProcessRunner
 from .paths import (
-    ROOT_DIR,
+    ROOT_DIR, doc_folder_for,
     months_in_range, discover_available_months, discover_enriched_months,
     normalized_csv_path, normalized_clean_csv_path, enriched_csv_path,
     cleaned_phones_csv_path, pick_enrichment_input,
 )
-from .state import load_state, save_state
+from .state import load_state, save_state, serialize_state
+
 
+# Rolling cap for the log pane; Tk text widgets degrade badly once tens of
+# thousands of lines accumulate
+MAX_LOG_LINES = 5000
 
 DEFAULT_COOKIES = (
     "NSC_JOeqtbnye4rqvqae52yysbdjdcwntcw=7ce2a3d93287e39e0a3142520a74f0b88d9f176cdcf72de67d2df59bf583b8a94149188e; "
@@ -31,12 +40,18 @@ class App(tk.Tk):
         self._busy = False
 
         self.state = load_state()
+        self._saved_state = dict(self.state)
+        self._state_dirty = False
+        self._last_saved_blob: str | None = None
+        self._log_queue: queue.Queue[str] = queue.Queue()
         self.runner = ProcessRunner(self._append_log)
 
         self._build_ui()
         self._load_state_defaults()
         self._refresh_months()
         self._refresh_clean_months()
+        self.after(50, self._drain_log)
+        self.after(1000, self._maybe_save_state)
 
     def _build_ui(self) -> None:
         self.columnconfigure(0, weight=1)
@@ -75,6 +90,17 @@ class App(tk.Tk):
         self.clear_btn = ttk.Button(controls, text="Clear Logs", command=lambda: self.log.delete(1.0, tk.END))
         self.clear_btn.grid(row=1, column=0, sticky="ew")
 
+        # Cache the widgets toggled on job start/end; every one of these
+        # supports configure(state=...), so no per-widget probing is needed
+        self._stateful_widgets = (
+            self.fetch_btn, self.csv_btn, self.enrich_btn, self.clean_btn,
+            self.stop_btn, self.clear_btn, self.refresh_months_btn, self.clean_refresh_months_btn,
+            self.f_start, self.f_end, self.f_cookies,
+            self.c_start, self.c_end,
+            self.month_combo, self.e_from, self.e_to, self.e_sleep,
+            self.clean_month_combo,
+        )
+
     def _build_fetch_tab(self) -> None:
         f = self.fetch_tab
         for i in range(4):
@@ -102,7 +128,6 @@ class App(tk.Tk):
         # Document type selector
         ttk.Label(f, text="Document Type").grid(row=4, column=0, sticky="w", pady=(8, 0))
         self.f_doc_type_var = tk.StringVar(value="MORTGAGE - MOR")
-        from src.config.doc_types import GUI_DOC_TYPE_OPTIONS
         self.f_doc_type_combo = ttk.Combobox(
             f,
             textvariable=self.f_doc_type_var,
@@ -137,7 +162,6 @@ class App(tk.Tk):
         # Document type selector
         ttk.Label(f, text="Document Type").grid(row=4, column=0, sticky="w", pady=(8, 0))
         self.c_doc_type_var = tk.StringVar(value="MORTGAGE - MOR")
-        from src.config.doc_types import GUI_DOC_TYPE_OPTIONS
         self.c_doc_type_combo = ttk.Combobox(
             f,
             textvariable=self.c_doc_type_var,
@@ -166,7 +190,6 @@ class App(tk.Tk):
         # Document type selector
         ttk.Label(f, text="Document Type").grid(row=2, column=0, sticky="w", pady=(8, 0))
         self.e_doc_type_var = tk.StringVar(value="MORTGAGE - MOR")
-        from src.config.doc_types import GUI_DOC_TYPE_OPTIONS
         self.e_doc_type_combo = ttk.Combobox(
             f,
             textvariable=self.e_doc_type_var,
@@ -214,7 +237,6 @@ class App(tk.Tk):
         # Document type selector
         ttk.Label(f, text="Document Type").grid(row=2, column=0, sticky="w", pady=(8, 0))
         self.clean_doc_type_var = tk.StringVar(value="MORTGAGE - MOR")
-        from src.config.doc_types import GUI_DOC_TYPE_OPTIONS
         self.clean_doc_type_combo = ttk.Combobox(
             f,
             textvariable=self.clean_doc_type_var,
@@ -281,26 +303,39 @@ class App(tk.Tk):
             if rc != 0:
                 return
             # Resolve paths based on selected document type
-            from .paths import doc_folder_for
             doc_folder = doc_folder_for(csv_doc_type_label)
             monthly_dir = ROOT_DIR / "data" / "silver" / "monthly" / doc_folder
+            # Batch all months into one manifest so a single subprocess pays
+            # the interpreter/pandas startup cost once instead of per month
+            pairs = []
             for m in months:
                 inp = monthly_dir / f"{m}_normalized.csv"
                 if not inp.exists():
                     self._append_log(f"[dedupe] Skipping {m} (no normalized CSV at {inp})")
                     continue
                 outp = monthly_dir / f"{m}_normalized_clean.csv"
-                args = [sys.executable, "-u", str(ROOT_DIR / "src" / "remove_duplicates.py"), str(inp), str(outp)]
-                self._append_log(f"[dedupe] Running dedupe for {m}")
-                done = threading.Event()
+                pairs.append((str(inp), str(outp)))
+
+            if not pairs:
+                self.after(0, self._refresh_months)
+                return
 
-                def _on_exit(_rc: int) -> None:
-                    self._append_log(f"[dedupe] Done {m} rc={_rc}")
-                    done.set()
+            manifest = Path(tempfile.gettempdir()) / f"miami_dedupe_{os.getpid()}.json"
+            manifest.write_text(json.dumps(pairs), encoding="utf-8")
+            args = [sys.executable, "-u", str(ROOT_DIR / "src" / "remove_duplicates.py"), "--manifest", str(manifest)]
+            self._append_log(f"[dedupe] Running dedupe for {len(pairs)} month(s)")
 
-                self.runner.run(args, cwd=ROOT_DIR, on_exit=_on_exit)
-                done.wait()
-            self._refresh_months()
+            def _on_exit(_rc: int) -> None:
+                self._append_log(f"[dedupe] Done rc={_rc}")
+                try:
+                    manifest.unlink()
+                except OSError:
+                    pass
+                # on_exit fires on the runner thread; hop back to the Tk
+                # loop before touching widgets
+                self.after(0, self._refresh_months)
+
+            self.runner.run(args, cwd=ROOT_DIR, on_exit=_on_exit)
 
         self._run(step3, label=f"Create CSV {start}..{end}", after=after_step3)
 
@@ -313,12 +348,10 @@ class App(tk.Tk):
             return
 
         # Get doc-type specific paths
-        doc_type = self.e_doc_type_var.get() if hasattr(self, 'e_doc_type_var') else "MORTGAGE - MOR"
-        from .paths import doc_folder_for
+        doc_type = self.e_doc_type_var.get() or "MORTGAGE - MOR"
         doc_folder = doc_folder_for(doc_type)
         src_path, reason = pick_enrichment_input(month, doc_folder)
         if src_path is None:
-            from .paths import normalized_clean_csv_path, normalized_csv_path
             messagebox.showerror("Input missing", f"No normalized CSV found for {month}.\nExpected:\n{normalized_clean_csv_path(month, doc_folder)}\nor\n{normalized_csv_path(month, doc_folder)}")
             return
         dst_path = enriched_csv_path(month, doc_folder)
@@ -352,7 +385,6 @@ class App(tk.Tk):
 
         # Get doc-type specific paths
         doc_type = self.clean_doc_type_var.get()
-        from .paths import doc_folder_for
         doc_folder = doc_folder_for(doc_type)
         src_path = enriched_csv_path(month, doc_folder)
         dst_path = cleaned_phones_csv_path(month, doc_folder)
@@ -373,13 +405,9 @@ class App(tk.Tk):
         self._run(args, label=f"Clean Phones {month}")
 
     def _refresh_clean_months(self) -> None:
-        # Get doc-type from clean tab
-        try:
-            doc_type = self.clean_doc_type_var.get() if hasattr(self, 'clean_doc_type_var') else "MORTGAGE - MOR"
-        except:
-            doc_type = "MORTGAGE - MOR"
+        # Get doc-type from clean tab; the var always exists once _build_ui ran
+        doc_type = self.clean_doc_type_var.get() or "MORTGAGE - MOR"
 
-        from .paths import doc_folder_for
         doc_folder = doc_folder_for(doc_type)
         months = discover_enriched_months(doc_folder)
         self.clean_month_combo["values"] = months
@@ -406,39 +434,49 @@ class App(tk.Tk):
         self.runner.stop()
 
     def _append_log(self, line: str) -> None:
-        self.log.insert(tk.END, line + "\n")
-        self.log.see(tk.END)
-        self.update_idletasks()  # Force GUI update for live streaming
+        # Thread-safe: runner threads only enqueue; all Tk calls happen in
+        # _drain_log on the main loop's recurring tick
+        self._log_queue.put(line)
+
+    def _drain_log(self) -> None:
+        # Drain queued lines in one batch so a chatty subprocess costs one
+        # insert/redraw per tick instead of one per line
+        lines = []
+        try:
+            while True:
+                lines.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            # Only autoscroll when the view is already pinned to the bottom;
+            # see() forces a full geometry pass and would also yank the view
+            # away from a user reading earlier output
+            follow = self.log.yview()[1] > 0.99
+            self.log.insert(tk.END, "\n".join(lines) + "\n")
+            # Trim the oldest lines so the widget stays bounded
+            count = int(self.log.index('end-1c').split('.')[0])
+            if count > MAX_LOG_LINES:
+                self.log.delete('1.0', f'{count - MAX_LOG_LINES}.0')
+            if follow:
+                self.log.see(tk.END)
+        self.after(50, self._drain_log)
 
     def _set_controls_enabled(self, enabled: bool) -> None:
         state = "normal" if enabled else "disabled"
-        for w in [
-            self.fetch_btn, self.csv_btn, self.enrich_btn, self.clean_btn,
-            self.stop_btn, self.clear_btn, self.refresh_months_btn, self.clean_refresh_months_btn,
-            self.f_start, self.f_end, self.f_cookies,
-            self.c_start, self.c_end,
-            self.month_combo, self.e_from, self.e_to, self.e_sleep,
-            self.clean_month_combo
-        ]:
-            try:
-                w.configure(state=state)
-            except Exception:
-                pass
+        for w in self._stateful_widgets:
+            w.configure(state=state)
 
     def _load_state_defaults(self) -> None:
         self.f_cookies.insert(0, self.state.get("cookies", DEFAULT_COOKIES))
         self.f_start.insert(0, self.state.get("fetch_start", "2025-01-01"))
         self.f_end.insert(0, self.state.get("fetch_end", "2025-01-31"))
 
-        # Load doc-type selections
-        if hasattr(self, 'f_doc_type_var'):
-            self.f_doc_type_var.set(self.state.get("fetch_doc_type", "MORTGAGE - MOR"))
-        if hasattr(self, 'c_doc_type_var'):
-            self.c_doc_type_var.set(self.state.get("csv_doc_type", "MORTGAGE - MOR"))
-        if hasattr(self, 'e_doc_type_var'):
-            self.e_doc_type_var.set(self.state.get("enrich_doc_type", "MORTGAGE - MOR"))
-        if hasattr(self, 'clean_doc_type_var'):
-            self.clean_doc_type_var.set(self.state.get("clean_doc_type", "MORTGAGE - MOR"))
+        # Load doc-type selections (the vars are created in _build_ui, which
+        # always runs before this, so no hasattr guards are needed)
+        self.f_doc_type_var.set(self.state.get("fetch_doc_type", "MORTGAGE - MOR"))
+        self.c_doc_type_var.set(self.state.get("csv_doc_type", "MORTGAGE - MOR"))
+        self.e_doc_type_var.set(self.state.get("enrich_doc_type", "MORTGAGE - MOR"))
+        self.clean_doc_type_var.set(self.state.get("clean_doc_type", "MORTGAGE - MOR"))
 
         self.c_start.insert(0, self.state.get("csv_start", "2025-01-01"))
         self.c_end.insert(0, self.state.get("csv_end", "2025-01-31"))
@@ -453,13 +491,9 @@ class App(tk.Tk):
             self.clean_month_var.set(last_clean_month)
 
     def _refresh_months(self) -> None:
-        # Get doc-type from enrich tab (default to MOR if not available)
-        try:
-            doc_type = self.e_doc_type_var.get() if hasattr(self, 'e_doc_type_var') else "MORTGAGE - MOR"
-        except:
-            doc_type = "MORTGAGE - MOR"
+        # Get doc-type from enrich tab (default to MOR if unset)
+        doc_type = self.e_doc_type_var.get() or "MORTGAGE - MOR"
 
-        from .paths import doc_folder_for
         doc_folder = doc_folder_for(doc_type)
         months = discover_available_months(doc_folder)
         self.month_combo["values"] = months
@@ -471,19 +505,33 @@ class App(tk.Tk):
             self.state["cookies"] = self.f_cookies.get().strip()
             self.state["fetch_start"] = self.f_start.get().strip()
             self.state["fetch_end"] = self.f_end.get().strip()
-            self.state["fetch_doc_type"] = self.f_doc_type_var.get() if hasattr(self, 'f_doc_type_var') else "MORTGAGE - MOR"
+            self.state["fetch_doc_type"] = self.f_doc_type_var.get()
             self.state["csv_start"] = self.c_start.get().strip()
             self.state["csv_end"] = self.c_end.get().strip()
-            self.state["csv_doc_type"] = self.c_doc_type_var.get() if hasattr(self, 'c_doc_type_var') else "MORTGAGE - MOR"
+            self.state["csv_doc_type"] = self.c_doc_type_var.get()
             self.state["sleep_sec"] = self.e_sleep.get().strip()
             self.state["month"] = self.month_var.get().strip()
-            self.state["enrich_doc_type"] = self.e_doc_type_var.get() if hasattr(self, 'e_doc_type_var') else "MORTGAGE - MOR"
-            self.state["clean_doc_type"] = self.clean_doc_type_var.get() if hasattr(self, 'clean_doc_type_var') else "MORTGAGE - MOR"
+            self.state["enrich_doc_type"] = self.e_doc_type_var.get()
+            self.state["clean_doc_type"] = self.clean_doc_type_var.get()
             self.state["clean_month"] = self.clean_month_var.get().strip()
-            save_state(self.state)
-        except:
+            # Mark dirty; the debounced saver tick writes at most once/second
+            if self.state != self._saved_state:
+                self._state_dirty = True
+        except (AttributeError, tk.TclError):
             pass
 
+    def _maybe_save_state(self) -> None:
+        if self._state_dirty:
+            self._state_dirty = False
+            # Serialize once and skip the write entirely if the payload is
+            # byte-identical to what was last written
+            blob = serialize_state(self.state)
+            if blob != self._last_saved_blob:
+                save_state(self.state, payload=blob)
+                self._last_saved_blob = blob
+            self._saved_state = dict(self.state)
+        self.after(1000, self._maybe_save_state)
+
 
 def main() -> None:
     app = App()
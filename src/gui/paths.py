@@ -1,25 +1,37 @@
 from __future__ import annotations
 
 import datetime as dt
+import functools
+import os
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+from ..config.doc_types import GUI_DOC_TYPE_OPTIONS, get_folder_name
+
 DOC_FOLDER = "MORTGAGE_MOR"
 
+# The GUI only ever passes the handful of combobox labels, so resolve them
+# once at import and make doc_folder_for a plain dict hit on that path
+_LABEL_FOLDERS = {label: get_folder_name(label) for label in GUI_DOC_TYPE_OPTIONS}
+
 ROOT_DIR = Path(__file__).resolve().parents[2]
 
 
 def doc_folder_for(code_or_label: str) -> str:
     """Convert document type code/label to folder name."""
-    from ..config.doc_types import get_folder_name
+    folder = _LABEL_FOLDERS.get(code_or_label)
+    if folder is not None:
+        return folder
     return get_folder_name(code_or_label)
 
 
+@functools.cache
 def silver_dir_for(doc_folder: str = DOC_FOLDER) -> Path:
     """Get silver directory for document type."""
     return ROOT_DIR / "data" / "silver" / "monthly" / doc_folder
 
 
+@functools.cache
 def gold_dir_for(doc_folder: str = DOC_FOLDER) -> Path:
     """Get gold directory for document type."""
     return ROOT_DIR / "data" / "gold" / "monthly" / doc_folder
@@ -44,16 +56,11 @@ def months_in_range(start_iso: str, end_iso: str) -> List[str]:
     if start > end:
         start, end = end, start
 
-    months: List[str] = []
-    cur = dt.date(start.year, start.month, 1)
-    last = dt.date(end.year, end.month, 1)
-    while cur <= last:
-        months.append(month_key_from_date(cur))
-        if cur.month == 12:
-            cur = dt.date(cur.year + 1, 1, 1)
-        else:
-            cur = dt.date(cur.year, cur.month + 1, 1)
-    return months
+    # Pure month arithmetic: format the keys directly rather than stepping
+    # a date object through each month
+    sy, sm = start.year, start.month
+    n = (end.year - sy) * 12 + (end.month - sm) + 1
+    return [f"{sy + (sm - 1 + i) // 12:04d}-{(sm - 1 + i) % 12 + 1:02d}" for i in range(n)]
 
 
 def normalized_csv_path(month: str, doc_folder: str = DOC_FOLDER) -> Path:
@@ -76,38 +83,89 @@ def cleaned_phones_csv_path(month: str, doc_folder: str = DOC_FOLDER) -> Path:
     return gold_dir / f"{month}_phones_cleaned.csv"
 
 
-def discover_available_months(doc_folder: str = DOC_FOLDER) -> List[str]:
+# Month discovery cache keyed by doc folder: (directory mtime_ns, months,
+# per-month (has_clean, has_base) index). The results only depend on file
+# names, so the directory mtime is a sufficient invalidation signal and
+# repeat refreshes skip the directory walk.
+_months_cache: dict = {}
+
+
+def _scan_silver(doc_folder: str) -> Tuple[tuple, dict]:
     silver_dir = silver_dir_for(doc_folder)
-    months = set()
-    if silver_dir.exists():
-        for p in silver_dir.glob("*_normalized*.csv"):
-            name = p.name
-            if "_normalized" in name:
-                month = name.split("_normalized")[0]
-                months.add(month)
-    return sorted(months)
+    try:
+        mtime = silver_dir.stat().st_mtime_ns
+    except OSError:
+        _months_cache.pop(doc_folder, None)
+        return (), {}
+
+    cached = _months_cache.get(doc_folder)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    # os.scandir with plain string checks: no fnmatch pass and no Path
+    # object allocated per directory entry. One pass also records which
+    # variants exist so pick_enrichment_input needs no extra stat calls.
+    index: dict = {}
+    with os.scandir(silver_dir) as it:
+        for entry in it:
+            name = entry.name
+            if not (name.endswith('.csv') and '_normalized' in name):
+                continue
+            month = name.partition('_normalized')[0]
+            flags = index.setdefault(month, [False, False])
+            if name.endswith('_normalized_clean.csv'):
+                flags[0] = True
+            elif name.endswith('_normalized.csv'):
+                flags[1] = True
+    months = tuple(sorted(index))
+    _months_cache[doc_folder] = (mtime, months, index)
+    return months, index
+
+
+def discover_available_months(doc_folder: str = DOC_FOLDER) -> List[str]:
+    months, _ = _scan_silver(doc_folder)
+    return list(months)
+
+
+_enriched_months_cache: dict = {}
 
 
 def discover_enriched_months(doc_folder: str = DOC_FOLDER) -> List[str]:
-    """Discover months with enriched CSV files in gold folder."""
+    """Discover months with enriched CSV files in gold folder.
+
+    Memoized on the gold directory's mtime like discover_available_months,
+    so combobox refreshes skip the glob walk when nothing changed.
+    """
     gold_dir = gold_dir_for(doc_folder)
+    try:
+        mtime = gold_dir.stat().st_mtime_ns
+    except OSError:
+        _enriched_months_cache.pop(doc_folder, None)
+        return []
+
+    cached = _enriched_months_cache.get(doc_folder)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+
     months = set()
-    if gold_dir.exists():
-        for p in gold_dir.glob("*_enriched.csv"):
-            name = p.name
-            if "_enriched" in name:
-                month = name.split("_enriched")[0]
-                months.add(month)
-    return sorted(months)
+    with os.scandir(gold_dir) as it:
+        for entry in it:
+            name = entry.name
+            if name.endswith('_enriched.csv'):
+                months.add(name.partition('_enriched')[0])
+    result = sorted(months)
+    _enriched_months_cache[doc_folder] = (mtime, tuple(result))
+    return result
 
 
 def pick_enrichment_input(month: str, doc_folder: str = DOC_FOLDER) -> Tuple[Optional[Path], str]:
-    cleaned = normalized_clean_csv_path(month, doc_folder)
-    if cleaned.exists():
-        return cleaned, "normalized_clean"
-    base = normalized_csv_path(month, doc_folder)
-    if base.exists():
-        return base, "normalized"
+    # Consult the cached directory index instead of stat-ing each candidate
+    _, index = _scan_silver(doc_folder)
+    has_clean, has_base = index.get(month, (False, False))
+    if has_clean:
+        return normalized_clean_csv_path(month, doc_folder), "normalized_clean"
+    if has_base:
+        return normalized_csv_path(month, doc_folder), "normalized"
     return None, "missing"
 
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import subprocess
 import sys
 import threading
@@ -25,20 +26,23 @@ class ProcessRunner:
                 self.on_line(f"[cmd] {' '.join(args)}")
                 env = os.environ.copy()
                 env["PYTHONUNBUFFERED"] = "1"
-                env["PYTHONIOENCODING"] = "utf-8"
+                # Unbuffered byte pipe: text mode with bufsize=1 silently
+                # falls back to block buffering, which is why progress used
+                # to arrive in chunks instead of line by line
                 self._proc = subprocess.Popen(
                     args,
                     cwd=str(cwd) if cwd else None,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
-                    bufsize=1,
-                    universal_newlines=True,
-                    text=True,
+                    bufsize=0,
                     env=env,
                 )
                 assert self._proc.stdout is not None
-                for line in self._proc.stdout:
-                    line = line.rstrip("\n")
+                # Wrap the raw pipe once so a single decoder handles the
+                # stream instead of a per-line decode call
+                reader = io.TextIOWrapper(self._proc.stdout, encoding="utf-8", errors="replace", newline="")
+                for line in iter(reader.readline, ""):
+                    line = line.rstrip("\r\n")
                     if line:  # Skip empty lines
                         self.on_line(line)
                 rc = self._proc.wait()
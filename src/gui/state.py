@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import functools
 import json
-from pathlib import Path
+import os
 from typing import Any, Dict
 
-ROOT_DIR = Path(__file__).resolve().parents[2]
+from src.config.doc_types import get_label_from_code, DEFAULT_DOC_TYPE
+
+# Reuse the root resolved once in paths so each process pays the
+# Path.resolve() stat chain a single time
+from .paths import ROOT_DIR
+
 STATE_PATH = ROOT_DIR / "data" / "state" / "gui_state.json"
 
 
@@ -18,13 +24,15 @@ def load_state() -> Dict[str, Any]:
             return merged_state
     except Exception:
         pass
-    return get_default_state()
+    return get_default_state().copy()
 
 
+@functools.cache
 def get_default_state() -> Dict[str, Any]:
-    """Get default state values"""
-    from src.config.doc_types import get_label_from_code, DEFAULT_DOC_TYPE
+    """Get default state values.
 
+    Cached since the defaults are pure config; callers copy before mutating.
+    """
     default_label = get_label_from_code(DEFAULT_DOC_TYPE)
 
     return {
@@ -46,10 +54,25 @@ def get_default_state() -> Dict[str, Any]:
     }
 
 
-def save_state(state: Dict[str, Any]) -> None:
+def serialize_state(state: Dict[str, Any]) -> str:
+    """Serialize state once so callers can compare payloads before writing.
+
+    Compact separators: the file is machine-written and machine-read, so
+    indentation only adds encoder CPU and bytes on disk.
+    """
+    return json.dumps(state, separators=(',', ':'), ensure_ascii=False)
+
+
+def save_state(state: Dict[str, Any], payload: str | None = None) -> None:
     try:
+        if payload is None:
+            payload = serialize_state(state)
         STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        STATE_PATH.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8")
+        # Write to a temp file and rename so an interrupted save never
+        # leaves a truncated JSON behind for load_state to swallow
+        tmp = STATE_PATH.with_suffix(".json.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, STATE_PATH)
     except Exception:
         pass
 
@@ -2,10 +2,18 @@
 Main entry point for the AnyWho phone enrichment tool.
 """
 
+import logging
+import sys
+
 from src.cli.commands import create_parser, process_file, test_enhanced_scraping
 
 def main():
     """Main entry point"""
+    # Scraper messages flow through logging; INFO keeps the useful lines on
+    # stdout (where the GUI reads them) while the per-URL DEBUG chatter is
+    # skipped without ever being formatted
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     parser = create_parser()
     args = parser.parse_args()
 
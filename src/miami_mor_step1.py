@@ -1,16 +1,25 @@
 # src/miami_mor_step1.py
 import os
-import time
 import json
 import argparse
+import threading
 import datetime as dt
 from typing import Dict, Any, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# orjson serializes/parses several times faster than stdlib json on the
+# record payloads; fall back to stdlib when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE_URL = "https://onlineservices.miamidadeclerk.gov/officialrecords/api"
 STANDARD_SEARCH = f"{BASE_URL}/home/standardsearch"
 GET_RECORDS = f"{BASE_URL}/SearchResults/getStandardRecords"
@@ -37,6 +46,21 @@ def build_session(
         "Origin": "https://onlineservices.miamidadeclerk.gov",
     })
 
+    # Retries for transient failures live in the transport layer instead of
+    # hand-rolled loops around each call; the adapter also keeps a connection
+    # pool sized for the step2 worker threads so requests reuse sockets
+    retry = Retry(
+        total=3,
+        backoff_factor=1.5,
+        # Jitter desynchronizes the worker threads' retries so a transient
+        # 5xx doesn't get hit by all of them again in the same instant
+        backoff_jitter=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+    )
+    s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry))
+
     # Parse and set cookies from the cookie string
     if cookies_str:
         # Split by semicolon and parse each cookie
@@ -51,9 +75,7 @@ def build_session(
 def post_standard_search(
     session: requests.Session,
     date_str: str,
-    document_type: str = DEFAULT_DOC_TYPE,
-    retries: int = 3,
-    backoff_sec: float = 1.5
+    document_type: str = DEFAULT_DOC_TYPE
 ) -> str:
     params = {
         "partyName": "",
@@ -66,51 +88,49 @@ def post_standard_search(
         "token": "",
     }
 
-    # Ensure Origin header is set for POST requests
-    original_headers = session.headers.copy()
-    session.headers.update({
+    # Per-request headers are passed to the call instead of mutating the
+    # shared session headers, which would race under step2's worker threads
+    headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "Referer": "https://onlineservices.miamidadeclerk.gov/officialrecords/",
-    })
+    }
 
+    # The endpoint expects POST with Content-Length: 0, parameters in query string
+    # We send data="" to keep body empty. Transient failures (429/5xx) are
+    # retried by the adapter mounted in build_session.
+    resp = session.post(STANDARD_SEARCH, params=params, data=b"", headers=headers)
+    if resp.status_code in [403, 401]:
+        error_msg = f"Authentication error (status {resp.status_code}): {resp.text[:500]}"
+        raise RuntimeError(f"{error_msg}. Please refresh cookies from browser DevTools.")
+    resp.raise_for_status()
     try:
-        # The endpoint expects POST with Content-Length: 0, parameters in query string
-        # We send data="" to keep body empty
-        for attempt in range(1, retries + 1):
-            resp = session.post(STANDARD_SEARCH, params=params, data=b"")
-            if resp.ok:
-                try:
-                    data = resp.json()
-                    # Response shape may be {"qs": "..."} or similar; support common keys
-                    qs = data.get("qs") or data.get("QS") or data.get("result") or ""
-                    if not qs:
-                        raise ValueError(f"QS missing in response keys={list(data.keys())}")
-                    return qs
-                except json.JSONDecodeError as e:
-                    error_msg = f"Non-JSON response (status {resp.status_code}): {resp.text[:500]}"
-                    if attempt < retries:
-                        print(f"Attempt {attempt} failed: {error_msg}. Retrying...")
-                        time.sleep(backoff_sec * attempt)
-                        continue
-                    # Include response text in the exception for error logging
-                    raise RuntimeError(f"{error_msg}|RESPONSE_TEXT:{resp.text[:500]}")
-            elif resp.status_code in [403, 401]:
-                error_msg = f"Authentication error (status {resp.status_code}): {resp.text[:500]}"
-                if attempt < retries:
-                    print(f"Attempt {attempt} failed: {error_msg}. Retrying...")
-                    time.sleep(backoff_sec * attempt)
-                    continue
-                raise RuntimeError(f"{error_msg}. Please refresh cookies from browser DevTools.")
-            else:
-                if attempt < retries:
-                    time.sleep(backoff_sec * attempt)
-                else:
-                    resp.raise_for_status()
-        raise RuntimeError("Unreachable")
-    finally:
-        # Restore original headers
-        session.headers.clear()
-        session.headers.update(original_headers)
+        data = resp.json()
+    except json.JSONDecodeError:
+        error_msg = f"Non-JSON response (status {resp.status_code}): {resp.text[:500]}"
+        # Include response text in the exception for error logging
+        raise RuntimeError(f"{error_msg}|RESPONSE_TEXT:{resp.text[:500]}")
+    # Response shape may be {"qs": "..."} or similar; support common keys
+    qs = data.get("qs") or data.get("QS") or data.get("result") or ""
+    if not qs:
+        raise ValueError(f"QS missing in response keys={list(data.keys())}")
+    return qs
+
+# QS tokens are stable per (date, document type), so auto mode remembers
+# them across runs: a re-run over an already-fetched range skips the search
+# POST entirely. The cache file is loaded lazily and shared by step2's
+# worker threads, hence the lock.
+QS_CACHE_PATH = os.path.join("data", "state", "qs_cache.json")
+_qs_cache: Optional[Dict[str, str]] = None
+_qs_cache_lock = threading.Lock()
+
+def _load_qs_cache() -> Dict[str, str]:
+    global _qs_cache
+    if _qs_cache is None:
+        try:
+            _qs_cache = read_json(QS_CACHE_PATH)
+        except (OSError, ValueError):
+            _qs_cache = {}
+    return _qs_cache
 
 def get_qs(
     session: requests.Session,
@@ -125,76 +145,96 @@ def get_qs(
             raise SystemExit("Manual mode requires --qs to be provided")
         return qs_arg
     elif mode == "auto":
-        return post_standard_search(session, date_str, document_type)
+        key = f"{date_str}|{document_type}"
+        with _qs_cache_lock:
+            cache = _load_qs_cache()
+            cached = cache.get(key)
+        if cached:
+            return cached
+        qs = post_standard_search(session, date_str, document_type)
+        with _qs_cache_lock:
+            cache[key] = qs
+            ensure_dirs(os.path.dirname(QS_CACHE_PATH))
+            write_json(QS_CACHE_PATH, cache)
+        return qs
     else:
         raise SystemExit(f"Invalid mode: {mode}. Must be 'auto' or 'manual'")
 
 def get_standard_records(
     session: requests.Session,
-    qs: str,
-    retries: int = 3,
-    backoff_sec: float = 1.5
+    qs: str
 ) -> List[Dict[str, Any]]:
     params = {"qs": qs}
 
-    # Set the referer header for this specific request
+    # Referer for this specific request, passed per call rather than via
+    # session header mutation (shared session, worker threads)
     referer_url = f"https://onlineservices.miamidadeclerk.gov/officialrecords/SearchResults?qs={qs}"
 
-    # Store original headers to restore later
-    original_headers = session.headers.copy()
-    session.headers.update({"Referer": referer_url})
-
+    # Transient failures (429/5xx) are retried by the adapter mounted in
+    # build_session, so a single attempt suffices here
+    resp = session.get(GET_RECORDS, params=params, headers={"Referer": referer_url})
+    if resp.status_code in [403, 401]:
+        error_msg = f"Authentication error (status {resp.status_code}): {resp.text[:500]}"
+        raise RuntimeError(f"{error_msg}. Please refresh cookies from browser DevTools.")
+    resp.raise_for_status()
     try:
-        for attempt in range(1, retries + 1):
-            resp = session.get(GET_RECORDS, params=params)
-            if resp.ok:
-                try:
-                    data = resp.json()
-                    # Response may be either a dict with "recordingModels" or a list
-                    if isinstance(data, dict) and "recordingModels" in data:
-                        return data["recordingModels"]
-                    if isinstance(data, list):
-                        return data
-                    # Some responses include searchCritiriea and recordingModels (sample provided)
-                    # Extract conservatively if present
-                    recs = data.get("recordingModels")
-                    if recs is not None:
-                        return recs
-                    raise ValueError(f"Unexpected records response shape keys={list(data.keys())}")
-                except json.JSONDecodeError as e:
-                    error_msg = f"Non-JSON response (status {resp.status_code}): {resp.text[:500]}"
-                    if attempt < retries:
-                        print(f"Attempt {attempt} failed: {error_msg}. Retrying...")
-                        time.sleep(backoff_sec * attempt)
-                        continue
-                    # Include response text in the exception for error logging
-                    raise RuntimeError(f"{error_msg}|RESPONSE_TEXT:{resp.text[:500]}")
-            elif resp.status_code in [403, 401]:
-                error_msg = f"Authentication error (status {resp.status_code}): {resp.text[:500]}"
-                if attempt < retries:
-                    print(f"Attempt {attempt} failed: {error_msg}. Retrying...")
-                    time.sleep(backoff_sec * attempt)
-                    continue
-                raise RuntimeError(f"{error_msg}. Please refresh cookies from browser DevTools.")
-            else:
-                if attempt < retries:
-                    time.sleep(backoff_sec * attempt)
-                else:
-                    resp.raise_for_status()
-        raise RuntimeError("Unreachable")
-    finally:
-        # Restore original headers
-        session.headers.clear()
-        session.headers.update(original_headers)
+        data = resp.json()
+    except json.JSONDecodeError:
+        error_msg = f"Non-JSON response (status {resp.status_code}): {resp.text[:500]}"
+        # Include response text in the exception for error logging
+        raise RuntimeError(f"{error_msg}|RESPONSE_TEXT:{resp.text[:500]}")
+    # Response may be either a dict with "recordingModels" or a list
+    if isinstance(data, dict) and "recordingModels" in data:
+        return data["recordingModels"]
+    if isinstance(data, list):
+        return data
+    # Some responses include searchCritiriea and recordingModels (sample provided)
+    # Extract conservatively if present
+    recs = data.get("recordingModels")
+    if recs is not None:
+        return recs
+    raise ValueError(f"Unexpected records response shape keys={list(data.keys())}")
+
+def parse_cookie_keys(cookies_str: str) -> tuple:
+    """Extract the sorted cookie names (not values) for audit summaries."""
+    keys = set()
+    if cookies_str:
+        for cookie_pair in cookies_str.split(';'):
+            cookie_pair = cookie_pair.strip()
+            if '=' in cookie_pair:
+                name, _ = cookie_pair.split('=', 1)
+                keys.add(name.strip())
+    return tuple(sorted(keys))
 
 def ensure_dirs(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
-def write_json(path: str, obj: Any) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+def write_json(path: str, obj: Any, compact: bool = False) -> None:
+    # Write to a sibling temp file and os.replace it into place so readers
+    # (and interrupted runs) never observe a partially written file.
+    # compact=True drops the indentation for machine-read payloads like the
+    # daily records, which shrinks them substantially on disk.
+    tmp_path = f"{path}.tmp"
+    if orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(obj, option=option))
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if compact:
+                json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+            else:
+                json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
 
-def main():
+def read_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Step 1: Fetch daily MORTGAGE - MOR records")
     parser.add_argument("--date", required=True, help="YYYY-MM-DD (daily granularity)")
     parser.add_argument("--qs", help="Query string token for the search (required in manual mode)")
@@ -202,7 +242,14 @@ def main():
     parser.add_argument("--document-type", default=DEFAULT_DOC_TYPE, help='e.g., "MORTGAGE - MOR"')
     parser.add_argument("--cookies", default=os.getenv("COOKIES"), help="Full cookie string from browser")
     parser.add_argument("--out-root", default="data/bronze", help="Root output folder")
-    args = parser.parse_args()
+    return parser
+
+# Built once at import so repeat invocations (and step2's import of this
+# module) don't re-run the add_argument calls
+_PARSER = _build_parser()
+
+def main():
+    args = _PARSER.parse_args()
 
     # Validate date
     dt.date.fromisoformat(args.date)
@@ -227,19 +274,15 @@ def main():
     day_dir = os.path.join(args.out_root, args.date, "MOR")
     ensure_dirs(day_dir)
     out_json = os.path.join(day_dir, "records.json")
-    write_json(out_json, records)
+    write_json(out_json, records, compact=True)
 
-    count = len(records) if isinstance(records, list) else 0
+    # get_standard_records always returns a list (it raises on any other
+    # response shape), so no isinstance guard is needed
+    count = len(records)
     overflow = count >= 500
 
     # Extract cookie keys for auditability (not values)
-    cookie_keys = []
-    if args.cookies:
-        for cookie_pair in args.cookies.split(';'):
-            cookie_pair = cookie_pair.strip()
-            if '=' in cookie_pair:
-                name, _ = cookie_pair.split('=', 1)
-                cookie_keys.append(name.strip())
+    cookie_keys = parse_cookie_keys(args.cookies)
 
     summary = {
         "date": args.date,
@@ -248,7 +291,7 @@ def main():
         "count": count,
         "overflow_500_cap": overflow,
         "qs_used": qs,
-        "cookie_keys_present": cookie_keys,
+        "cookie_keys_present": list(cookie_keys),
         "saved_to": out_json,
         "fetched_at": dt.datetime.utcnow().isoformat() + "Z",
     }
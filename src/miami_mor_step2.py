@@ -11,7 +11,11 @@ import time
 import json
 import csv
 import argparse
+import atexit
+import functools
+import threading
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 import requests
@@ -29,6 +33,8 @@ try:
         get_standard_records,
         ensure_dirs,
         write_json,
+        read_json,
+        parse_cookie_keys,
         post_standard_search  # For error handling consistency
     )
 except ImportError:
@@ -40,6 +46,8 @@ except ImportError:
             get_standard_records,
             ensure_dirs,
             write_json,
+            read_json,
+            parse_cookie_keys,
             post_standard_search  # For error handling consistency
         )
     except ImportError:
@@ -56,6 +64,8 @@ except ImportError:
             get_standard_records,
             ensure_dirs,
             write_json,
+            read_json,
+            parse_cookie_keys,
             post_standard_search  # For error handling consistency
         )
 
@@ -77,14 +87,12 @@ def generate_date_range(start_date: str, end_date: str) -> List[str]:
 
 def load_qs_map(qs_map_path: str) -> Dict[str, str]:
     """Load QS mapping from JSON file for manual mode."""
-    with open(qs_map_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return read_json(qs_map_path)
 
 def load_state(state_path: str) -> Dict[str, Any]:
     """Load processing state from JSON file."""
     if os.path.exists(state_path):
-        with open(state_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(state_path)
     return {"processed_dates": [], "last_processed": None}
 
 def save_state(state_path: str, state: Dict[str, Any]) -> None:
@@ -93,19 +101,34 @@ def save_state(state_path: str, state: Dict[str, Any]) -> None:
     with open(state_path, 'w', encoding='utf-8') as f:
         json.dump(state, f, indent=2, ensure_ascii=False)
 
-def is_date_processed(date_str: str, out_root: str, document_type: str) -> bool:
-    """Check if a date has already been processed by looking for summary.json."""
-    # Convert document type to folder name (e.g., "MORTGAGE - MOR" -> "MOR")
-    doc_folder = document_type.replace(" - ", "_").replace(" ", "_").upper()
-    summary_path = os.path.join(out_root, date_str, doc_folder, "summary.json")
-    return os.path.exists(summary_path)
+def find_processed_dates(out_root: str, doc_folder: str) -> set:
+    """Collect all dates with an existing summary.json in one directory scan.
 
-def write_jsonl_record(file_path: str, record: Dict[str, Any]) -> None:
-    """Append a single record to JSONL file."""
-    ensure_dirs(os.path.dirname(file_path))
-    with open(file_path, 'a', encoding='utf-8') as f:
-        json.dump(record, f, ensure_ascii=False)
-        f.write('\n')
+    One os.scandir over out_root plus a single stat per existing date dir
+    replaces the per-requested-date path probes, so resuming a long range
+    does not pay a filesystem round-trip for every date in it.
+    """
+    processed = set()
+    try:
+        with os.scandir(out_root) as it:
+            for entry in it:
+                if entry.is_dir() and os.path.exists(
+                    os.path.join(entry.path, doc_folder, "summary.json")
+                ):
+                    processed.add(entry.name)
+    except OSError:
+        pass
+    return processed
+
+def write_jsonl_records(f, records: List[Dict[str, Any]]) -> None:
+    """Write a day's records to an open JSONL file.
+
+    writelines consumes the generator lazily, so only one serialized record
+    is in memory at a time regardless of how large the day is; the file's
+    buffer still coalesces the actual writes.
+    """
+    if records:
+        f.writelines(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
 
 def write_error_log(error_path: str, error_msg: str, response_text: str = "", date_str: str = "", document_type: str = "") -> None:
     """Write error details to a log file for diagnosis."""
@@ -136,36 +159,33 @@ def write_error_log(error_path: str, error_msg: str, response_text: str = "", da
             print(f"CRITICAL: Could not write error log. Original error: {error_msg}")
 
 
-def get_error_log_path(out_root: str, date_str: str, document_type: str, specific_file: str = "error.log") -> str:
-    """Get a safe error log path, with fallback to general error directory."""
-    doc_folder = document_type.replace(" - ", "_").replace(" ", "_").upper()
-    primary_path = os.path.join(out_root, date_str, doc_folder, specific_file)
+def get_error_log_path(out_root: str, date_str: str, doc_folder: str, specific_file: str = "error.log") -> str:
+    """Get a safe error log path, with fallback to general error directory.
 
-    # Check if primary path is accessible
+    No probe write: if the directory can be created the primary path is
+    returned, and write_error_log already falls back to the general error
+    directory should the actual write fail.
+    """
+    primary_path = os.path.join(out_root, date_str, doc_folder, specific_file)
     try:
         ensure_dirs(os.path.dirname(primary_path))
-        # Test if we can write to the directory
-        test_file = os.path.join(os.path.dirname(primary_path), "test_write.tmp")
-        with open(test_file, 'w') as f:
-            f.write("test")
-        os.remove(test_file)
         return primary_path
     except Exception:
         # Fallback to general error directory
         return os.path.join("data", "bronze", "errors", f"{date_str}_{specific_file}")
 
-def write_monthly_csv(csv_path: str, date_str: str, count: int, overflow: bool) -> None:
-    """Append daily summary to monthly CSV file."""
-    ensure_dirs(os.path.dirname(csv_path))
-    file_exists = os.path.exists(csv_path)
+@functools.lru_cache(maxsize=128)
+def _read_day_json(path: str, mtime_ns: int) -> Any:
+    """Parse a daily JSON file, memoized on (path, mtime).
 
-    with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(['date', 'count', 'overflow_500_cap'])
-        writer.writerow([date_str, count, overflow])
+    Keying on the file's mtime means repeated rebuilds in one run (e.g. a
+    range spanning a month boundary re-run with --force) reuse the parsed
+    records instead of re-reading unchanged files, while edits on disk
+    naturally invalidate the entry.
+    """
+    return read_json(path)
 
-def rebuild_monthly_files(dates: List[str], out_root: str, document_type: str) -> None:
+def rebuild_monthly_files(dates: List[str], out_root: str, doc_folder: str) -> None:
     """Rebuild monthly JSONL and CSV files from existing daily records, grouped by month."""
     if not dates:
         return
@@ -179,41 +199,45 @@ def rebuild_monthly_files(dates: List[str], out_root: str, document_type: str) -
             dates_by_month[month_str] = []
         dates_by_month[month_str].append(date_str)
 
-    doc_folder = document_type.replace(" - ", "_").replace(" ", "_").upper()
+    # All monthly files live in the same directory; create it once up front
+    root = Path(out_root)
+    monthly_dir = root / "monthly" / doc_folder
+    monthly_dir.mkdir(parents=True, exist_ok=True)
 
-    # Process each month separately
+    # Process each month separately, holding one JSONL and one CSV handle
+    # open per month instead of reopening the files for every record
     for month_str, month_dates in dates_by_month.items():
-        # Paths for monthly files
-        monthly_dir = os.path.join(out_root, "monthly", doc_folder)
-        jsonl_path = os.path.join(monthly_dir, f"{month_str}_records.jsonl")
-        csv_path = os.path.join(monthly_dir, f"{month_str}_summary.csv")
-
-        # Clear existing files if they exist
-        if os.path.exists(jsonl_path):
-            os.remove(jsonl_path)
-        if os.path.exists(csv_path):
-            os.remove(csv_path)
-
-        # Rebuild from daily records for this month
-        for date_str in month_dates:
-            day_dir = os.path.join(out_root, date_str, doc_folder)
-            records_path = os.path.join(day_dir, "records.json")
-            summary_path = os.path.join(day_dir, "summary.json")
-
-            if os.path.exists(records_path) and os.path.exists(summary_path):
-                # Load records and summary
-                with open(records_path, 'r', encoding='utf-8') as f:
-                    records = json.load(f)
-
-                with open(summary_path, 'r', encoding='utf-8') as f:
-                    summary = json.load(f)
-
-                # Append each record to JSONL
-                for record in records:
-                    write_jsonl_record(jsonl_path, record)
-
-                # Append to CSV
-                write_monthly_csv(csv_path, date_str, summary['count'], summary['overflow_500_cap'])
+        jsonl_path = monthly_dir / f"{month_str}_records.jsonl"
+        csv_path = monthly_dir / f"{month_str}_summary.csv"
+
+        with open(jsonl_path, 'w', encoding='utf-8') as jsonl_f, \
+             open(csv_path, 'w', newline='', encoding='utf-8') as csv_f:
+            # Accumulate the summary rows and emit them in one writerows
+            # call after the day loop
+            summary_rows = [['date', 'count', 'overflow_500_cap']]
+
+            # Rebuild from daily records for this month
+            for date_str in month_dates:
+                day_dir = root / date_str / doc_folder
+                records_path = day_dir / "records.json"
+                summary_path = day_dir / "summary.json"
+
+                # One stat per file serves as both the existence check and
+                # the memoization key; no separate exists() probes
+                try:
+                    records_mtime = records_path.stat().st_mtime_ns
+                    summary_mtime = summary_path.stat().st_mtime_ns
+                except OSError:
+                    continue
+
+                records = _read_day_json(str(records_path), records_mtime)
+                summary = _read_day_json(str(summary_path), summary_mtime)
+
+                # One buffered write per day instead of one per record
+                write_jsonl_records(jsonl_f, records)
+                summary_rows.append([date_str, summary['count'], summary['overflow_500_cap']])
+
+            csv.writer(csv_f).writerows(summary_rows)
 
         print(f"Rebuilt monthly files for {month_str}: {len(month_dates)} dates")
 
@@ -221,10 +245,12 @@ def process_date(
     date_str: str,
     session: requests.Session,
     document_type: str,
+    doc_folder: str,
     mode: str,
     qs_arg: Optional[str],
     out_root: str,
-    sleep_sec: float = 1.0
+    sleep_sec: float = 1.0,
+    cookie_keys: tuple = ()
 ) -> Dict[str, Any]:
     """Process a single date and return summary information."""
     print(f"Processing date: {date_str}")
@@ -249,18 +275,15 @@ def process_date(
                 response_text = error_str.split("|RESPONSE_TEXT:")[1]
 
             # Get safe error log path with fallback
-            error_path = get_error_log_path(out_root, date_str, document_type, "error.log")
+            error_path = get_error_log_path(out_root, date_str, doc_folder, "error.log")
             write_error_log(error_path, error_str.split("|RESPONSE_TEXT:")[0], response_text, date_str, document_type)
             print(f"Error logged to {error_path}")
         raise
 
-    # Calculate overflow flag
-    count = len(records) if isinstance(records, list) else 0
+    # Calculate overflow flag; get_standard_records always returns a list
+    count = len(records)
     overflow = count >= 500
 
-    # Create document folder name
-    doc_folder = document_type.replace(" - ", "_").replace(" ", "_").upper()
-
     # Define day_dir early for error logging
     day_dir = os.path.join(out_root, date_str, doc_folder)
 
@@ -268,17 +291,7 @@ def process_date(
     ensure_dirs(day_dir)
 
     records_path = os.path.join(day_dir, "records.json")
-    write_json(records_path, records)
-
-    # Extract cookie keys for auditability
-    cookie_keys = []
-    cookies_env = os.getenv("COOKIES", "")
-    if cookies_env:
-        for cookie_pair in cookies_env.split(';'):
-            cookie_pair = cookie_pair.strip()
-            if '=' in cookie_pair:
-                name, _ = cookie_pair.split('=', 1)
-                cookie_keys.append(name.strip())
+    write_json(records_path, records, compact=True)
 
     # Create summary
     summary = {
@@ -288,7 +301,7 @@ def process_date(
         "count": count,
         "overflow_500_cap": overflow,
         "qs_used": qs,
-        "cookie_keys_present": cookie_keys,
+        "cookie_keys_present": list(cookie_keys),
         "saved_to": records_path,
         "fetched_at": dt.datetime.utcnow().isoformat() + "Z",
     }
@@ -299,7 +312,7 @@ def process_date(
     print(f"Completed: {count} records, overflow={overflow}")
     return summary
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Step 2: Multi-day MORTGAGE - MOR records extraction with checkpointing"
     )
@@ -316,10 +329,17 @@ def main():
                        help="Path to state file for checkpointing")
     parser.add_argument("--sleep-sec", type=float, default=1.0,
                        help="Seconds to sleep between requests")
+    parser.add_argument("--workers", type=int, default=8,
+                       help="Concurrent date workers")
     parser.add_argument("--force", action="store_true",
                        help="Force reprocessing of already completed dates")
+    return parser
 
-    args = parser.parse_args()
+# Built once at import, matching step1
+_PARSER = _build_parser()
+
+def main():
+    args = _PARSER.parse_args()
 
     # Validate arguments
     try:
@@ -339,16 +359,15 @@ def main():
 
     # Load and validate QS map for manual mode
     qs_map = None
+    qs_keys = set()
     if args.mode == "manual":
         if not os.path.exists(args.qs_map):
             raise SystemExit(f"QS map file not found: {args.qs_map}")
         qs_map = load_qs_map(args.qs_map)
 
-        # Validate that all dates in range have QS values
-        missing_dates = []
-        for date_str in dates:
-            if date_str not in qs_map:
-                missing_dates.append(date_str)
+        # Validate the whole range against the key set in one pass
+        qs_keys = set(qs_map)
+        missing_dates = [date_str for date_str in dates if date_str not in qs_keys]
 
         if missing_dates:
             print(f"Warning: Missing QS values for {len(missing_dates)} dates:")
@@ -361,65 +380,131 @@ def main():
 
     print(f"Processing {len(dates)} dates from {args.start_date} to {args.end_date}")
 
-    # Build session
+    # Folder name derived from the document type (e.g. "MORTGAGE - MOR" ->
+    # "MORTGAGE_MOR"); computed once here and threaded through instead of
+    # re-deriving it in every callee
+    doc_folder = args.document_type.replace(" - ", "_").replace(" ", "_").upper()
+
+    # Build session; cookie names are parsed once here for the per-date
+    # audit summaries instead of re-splitting the env string on every date
     session = build_session(args.cookies)
+    cookie_keys = parse_cookie_keys(args.cookies)
+
+    # Warm the session up front: establishes the TLS connection the pool
+    # will reuse and surfaces stale cookies before any date work starts
+    try:
+        warmup = session.get("https://onlineservices.miamidadeclerk.gov/officialrecords/", timeout=30)
+        if warmup.status_code in [401, 403]:
+            raise SystemExit(
+                f"Authentication check failed (status {warmup.status_code}). "
+                "Please refresh cookies from browser DevTools."
+            )
+    except requests.RequestException as e:
+        print(f"Warning: session warmup failed ({e}); continuing anyway")
 
     # Load state
     state = load_state(args.state_path)
 
-    # Process each date
-    processed_dates = []
-    failed_dates = []
-
+    # First pass: filter out already-processed dates and dates without a QS,
+    # keeping the worker pool fed with only the dates that need network work
+    processed_set = set() if args.force else find_processed_dates(args.out_root, doc_folder)
+    work = []
     for date_str in dates:
-        try:
-            # Check if already processed (unless force is set)
-            if not args.force and is_date_processed(date_str, args.out_root, args.document_type):
-                print(f"Skipping {date_str} (already processed)")
+        if date_str in processed_set:
+            print(f"Skipping {date_str} (already processed)")
+            continue
+
+        qs_arg = None
+        if args.mode == "manual":
+            if date_str not in qs_keys:
+                print(f"Warning: No QS found for {date_str} in qs_map, skipping")
                 continue
+            qs_arg = qs_map[date_str]
+
+        work.append((date_str, qs_arg))
+
+    # Second pass: process dates concurrently. Each date is dominated by the
+    # two request round-trips plus the politeness sleep, so running them
+    # serially wastes wall time; state updates stay behind a lock.
+    processed_dates = []
+    failed_dates = []
+    state_lock = threading.Lock()
+    auth_failed = threading.Event()
+
+    # Debounced checkpointing: write the state file every 10 completed dates
+    # rather than on each one. The atexit hook flushes the tail on normal
+    # exit and on Ctrl-C (KeyboardInterrupt unwinds to a normal interpreter
+    # exit, so atexit still runs).
+    state_dirty = [False]
+
+    def _flush_state():
+        with state_lock:
+            if state_dirty[0]:
+                save_state(args.state_path, state)
+                state_dirty[0] = False
+
+    atexit.register(_flush_state)
+
+    def _process_one(task):
+        task_date, task_qs = task
+        if auth_failed.is_set():
+            raise RuntimeError("Skipped: authentication already failed")
+        return process_date(
+            date_str=task_date,
+            session=session,
+            document_type=args.document_type,
+            doc_folder=doc_folder,
+            mode=args.mode,
+            qs_arg=task_qs,
+            out_root=args.out_root,
+            sleep_sec=args.sleep_sec,
+            cookie_keys=cookie_keys
+        )
 
-            # Get QS for manual mode
-            qs_arg = None
-            if args.mode == "manual":
-                if date_str not in qs_map:
-                    print(f"Warning: No QS found for {date_str} in qs_map, skipping")
+    if work:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {pool.submit(_process_one, task): task for task in work}
+            for future in as_completed(futures):
+                date_str, _ = futures[future]
+                try:
+                    future.result()
+                except RuntimeError as e:
+                    if "Authentication error" in str(e) or "Please refresh cookies" in str(e):
+                        if not auth_failed.is_set():
+                            auth_failed.set()
+                            # Persist progress immediately so the restart
+                            # after a cookie refresh resumes from here
+                            _flush_state()
+                            print(f"Authentication error on {date_str}: {e}")
+                            print("Please refresh cookies from browser DevTools and restart")
+                    elif "authentication already failed" not in str(e):
+                        print(f"Error processing {date_str}: {e}")
+                        failed_dates.append(date_str)
                     continue
-                qs_arg = qs_map[date_str]
-
-            # Process the date
-            summary = process_date(
-                date_str=date_str,
-                session=session,
-                document_type=args.document_type,
-                mode=args.mode,
-                qs_arg=qs_arg,
-                out_root=args.out_root,
-                sleep_sec=args.sleep_sec
-            )
+                except Exception as e:
+                    print(f"Unexpected error processing {date_str}: {e}")
+                    failed_dates.append(date_str)
+                    continue
+
+                with state_lock:
+                    processed_dates.append(date_str)
+                    state["processed_dates"] = processed_dates
+                    state["last_processed"] = date_str
+                    state_dirty[0] = True
+                    if len(processed_dates) % 10 == 0:
+                        save_state(args.state_path, state)
+                        state_dirty[0] = False
+
+    _flush_state()
 
-            processed_dates.append(date_str)
-
-            # Update state
-            state["processed_dates"] = processed_dates
-            state["last_processed"] = date_str
-            save_state(args.state_path, state)
-
-        except RuntimeError as e:
-            if "Authentication error" in str(e) or "Please refresh cookies" in str(e):
-                print(f"Authentication error on {date_str}: {e}")
-                print("Please refresh cookies from browser DevTools and restart")
-                break
-            else:
-                print(f"Error processing {date_str}: {e}")
-                failed_dates.append(date_str)
-        except Exception as e:
-            print(f"Unexpected error processing {date_str}: {e}")
-            failed_dates.append(date_str)
+    # Completion order is nondeterministic under the pool; sort so monthly
+    # files are rebuilt in date order
+    processed_dates.sort()
 
     # Rebuild monthly files for processed dates
     if processed_dates:
         print(f"Rebuilding monthly files for {len(processed_dates)} processed dates...")
-        rebuild_monthly_files(processed_dates, args.out_root, args.document_type)
+        rebuild_monthly_files(processed_dates, args.out_root, doc_folder)
 
     # Final summary
     print(f"\nProcessing complete:")
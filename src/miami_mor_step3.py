@@ -1,19 +1,38 @@
 # src/miami_mor_step3.py
-import os, json, argparse, datetime as dt
+import os, csv, json, argparse, datetime as dt
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import pandas as pd
+
+# orjson parses the daily record dumps several times faster than stdlib
+# json; fall back to stdlib when it is not installed (same pattern as step1)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Company detection removed - not needed with simplified borrower/debtor identification
 
-def normalize_address(rec: Dict[str, Any]) -> str:
+# Output schema (without the Date column, which main() prepends)
+_COLUMNS = [
+    "Doc_Type_Code", "Name", "Address", "Phone1", "Phone2", "Phone3", "Phone4",
+    "Rate of Interest", "Loan Amount", "Date of Document", "Doc Type",
+    "CFN_Master_ID", "Rec_Book", "Rec_Page", "Rec_BookPage", "Book_Type"
+]
+
+# The same property shows up across many records (units of one street
+# address), so the strip/dedupe/join result is memoized per component
+# tuple; each pool worker keeps its own cache
+@functools.lru_cache(maxsize=65536)
+def _normalize_address_cached(no_unit: Any, unit: Any, address: Any) -> str:
     parts = []
-    if rec.get("addressnounit"):
-        parts.append(str(rec["addressnounit"]).strip())
-    if rec.get("addressunit"):
-        parts.append(str(rec["addressunit"]).strip())
-    if rec.get("address"):
-        parts.append(str(rec["address"]).strip())
+    if no_unit:
+        parts.append(str(no_unit).strip())
+    if unit:
+        parts.append(str(unit).strip())
+    if address:
+        parts.append(str(address).strip())
     # Deduplicate tokens
     seen, out = set(), []
     for p in parts:
@@ -22,89 +41,80 @@ def normalize_address(rec: Dict[str, Any]) -> str:
             out.append(p)
     return " ".join(out).strip()
 
+def normalize_address(rec: Dict[str, Any]) -> str:
+    return _normalize_address_cached(
+        rec.get("addressnounit"), rec.get("addressunit"), rec.get("address"))
+
 # Borrower identification logic removed - partY_CODE "D" guarantees borrower is firsT_PARTY
 
-def map_record_mor(rec: Dict[str, Any]) -> Dict[str, Any]:
-    # party_code "D" implies borrower is first party
-    borrower = (rec.get("firsT_PARTY") or "").strip()
-    address = normalize_address(rec)
-    doc_date = (rec.get("reC_DATE") or rec.get("doC_DATE") or "").strip()
-    loan_amount = rec.get("consideratioN_1")
-    return {
-        "Doc_Type_Code": "MOR",
-        "Name": borrower,
-        "Address": address,
-        "Phone1": "",
-        "Phone2": "",
-        "Phone3": "",
-        "Phone4": "",
-        "Rate of Interest": "",
-        "Loan Amount": loan_amount if loan_amount is not None else "",
-        "Date of Document": doc_date,
-        "Doc Type": (rec.get("doC_TYPE") or "").strip(),
-        "CFN_Master_ID": rec.get("cfN_MASTER_ID") or "",
-        "Rec_Book": str(rec.get("reC_BOOK") or ""),
-        "Rec_Page": str(rec.get("reC_PAGE") or ""),
-        "Rec_BookPage": rec.get("reC_BOOKPAGE") or "",
-        "Book_Type": (rec.get("booK_TYPE") or "").strip(),
-    }
-
-def map_record_lie(rec: Dict[str, Any]) -> Dict[str, Any]:
-    # Debtor-centric mapping for liens
-    party_code = (rec.get("partY_CODE") or "").upper()
-    first_party = (rec.get("firsT_PARTY") or "").strip()
-    second_party = (rec.get("seconD_PARTY") or "").strip()
-    # If Direct, creditor tends to be first party; debtor is second party
-    debtor = second_party if party_code == "D" else first_party
-    address = normalize_address(rec)
-    doc_date = (rec.get("reC_DATE") or rec.get("doC_DATE") or "").strip()
-    loan_amount = rec.get("consideratioN_1")
-    return {
-        "Doc_Type_Code": "LIE",
-        "Name": debtor,
-        "Address": address,
-        "Phone1": "",
-        "Phone2": "",
-        "Phone3": "",
-        "Phone4": "",
-        "Rate of Interest": "",
-        "Loan Amount": loan_amount if loan_amount is not None else "",
-        "Date of Document": doc_date,
-        "Doc Type": (rec.get("doC_TYPE") or "").strip(),
-        "CFN_Master_ID": rec.get("cfN_MASTER_ID") or "",
-        "Rec_Book": str(rec.get("reC_BOOK") or ""),
-        "Rec_Page": str(rec.get("reC_PAGE") or ""),
-        "Rec_BookPage": rec.get("reC_BOOKPAGE") or "",
-        "Book_Type": (rec.get("booK_TYPE") or "").strip(),
-    }
-
-def process_day(day_dir: Path, doc_code: str) -> pd.DataFrame:
+# Columns that are always empty at this stage (filled by later enrichment)
+_EMPTY_COLUMNS = ("Phone1", "Phone2", "Phone3", "Phone4", "Rate of Interest")
+
+def process_day(day_dir: Path, doc_code: str) -> Dict[str, list]:
+    # Returns a dict of per-column lists ({} when the day is empty); the
+    # lists concatenate cheaply in main and pickle faster than a DataFrame
+    # when crossing the process-pool boundary
     records_path = day_dir / "records.json"
     if not records_path.exists():
-        return pd.DataFrame()
-    with open(records_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+        return {}
+    # orjson wants bytes, and json.loads accepts them too, so read binary.
+    # There is no streaming parser among the project deps, so the file is
+    # parsed whole; dropping the raw buffer right away at least keeps the
+    # bytes and the parsed tree from being resident at the same time as the
+    # mapped rows
+    with open(records_path, "rb") as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    del raw
     # records.json may be a list; if dict with key recordingModels, extract that list
     if isinstance(data, dict) and "recordingModels" in data:
         data = data["recordingModels"]
     if not isinstance(data, list):
-        return pd.DataFrame()
-    rows = []
+        return {}
+
+    # Populate the column lists directly instead of building a 16-field
+    # dict per row and re-keying it afterwards; one loop, no intermediates
+    mor = doc_code == "MOR"
+    cols: Dict[str, list] = {k: [] for k in _COLUMNS}
+    count = 0
     for rec in data:
-        party_code = (rec.get("partY_CODE") or "").upper()
-        if doc_code == "MOR":
-            # Keep only Direct for mortgages
+        _get = rec.get
+        party_code = (_get("partY_CODE") or "").upper()
+        if mor:
+            # Keep only Direct for mortgages; "D" implies borrower is first party
             if party_code != "D":
                 continue
-            mapped = map_record_mor(rec)
+            name = (_get("firsT_PARTY") or "").strip()
         else:
-            # For liens, include both directions, map to debtor-centric
-            mapped = map_record_lie(rec)
+            # Liens include both directions, mapped debtor-centric: if
+            # Direct, creditor tends to be first party, debtor second
+            name = ((_get("seconD_PARTY") if party_code == "D"
+                     else _get("firsT_PARTY")) or "").strip()
         # Skip rows without a name to keep enrichment compatible
-        if mapped.get("Name", "").strip():
-            rows.append(mapped)
-
-    return pd.DataFrame(rows)
+        if not name:
+            continue
+        loan_amount = _get("consideratioN_1")
+        cols["Doc_Type_Code"].append(doc_code)
+        cols["Name"].append(name)
+        cols["Address"].append(normalize_address(rec))
+        cols["Loan Amount"].append(loan_amount if loan_amount is not None else "")
+        cols["Date of Document"].append((_get("reC_DATE") or _get("doC_DATE") or "").strip())
+        cols["Doc Type"].append((_get("doC_TYPE") or "").strip())
+        cols["CFN_Master_ID"].append(_get("cfN_MASTER_ID") or "")
+        cols["Rec_Book"].append(str(_get("reC_BOOK") or ""))
+        cols["Rec_Page"].append(str(_get("reC_PAGE") or ""))
+        cols["Rec_BookPage"].append(_get("reC_BOOKPAGE") or "")
+        cols["Book_Type"].append((_get("booK_TYPE") or "").strip())
+        count += 1
+    if not count:
+        return {}
+
+    # The enrichment-stage columns are uniformly empty; one shared list
+    # serves all of them (consumers only read these)
+    empty = [""] * count
+    for k in _EMPTY_COLUMNS:
+        cols[k] = empty
+    return cols
 
 def month_key(date_str: str) -> str:
     d = dt.date.fromisoformat(date_str)
@@ -134,37 +144,40 @@ def main():
         by_month.setdefault(mk, []).append(cur.isoformat())
         cur += dt.timedelta(days=1)
 
-    for mk, dates in by_month.items():
-        # Build month output path
-        out_dir = Path(args.silver_root) / "monthly" / doc_folder
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_csv = out_dir / f"{mk}_normalized.csv"
-
-        # If not --force and CSV exists, rebuild only if new days are found
-        if out_csv.exists() and not args.force:
-            print(f"Skipping month {mk} (exists). Use --force to rebuild.")
-            continue
+    # Days are independent (separate files, CPU-bound JSON parse + mapping),
+    # so fan them out across processes; one pool is shared by all months
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for mk, dates in by_month.items():
+            # Build month output path
+            out_dir = Path(args.silver_root) / "monthly" / doc_folder
+            out_dir.mkdir(parents=True, exist_ok=True)
+            out_csv = out_dir / f"{mk}_normalized.csv"
+
+            # If not --force and CSV exists, rebuild only if new days are found
+            if out_csv.exists() and not args.force:
+                print(f"Skipping month {mk} (exists). Use --force to rebuild.")
+                continue
 
-        month_frames = []
-        for date_str in dates:
-            day_dir = Path(args.bronze_root) / date_str / doc_folder
-            df = process_day(day_dir, doc_code)
-            if not df.empty:
-                # add date column for traceability
-                df.insert(0, "Date", date_str)
-                month_frames.append(df)
-
-        if month_frames:
-            month_df = pd.concat(month_frames, ignore_index=True)
-        else:
-            month_df = pd.DataFrame(columns=[
-                "Date","Doc_Type_Code","Name","Address","Phone1","Phone2","Phone3","Phone4","Rate of Interest",
-                "Loan Amount","Date of Document","Doc Type","CFN_Master_ID",
-                "Rec_Book","Rec_Page","Rec_BookPage","Book_Type"
-            ])
-
-        month_df.to_csv(out_csv, index=False, encoding="utf-8")
-        print(f"Wrote {len(month_df)} rows -> {out_csv}")
+            day_dirs = [Path(args.bronze_root) / date_str / doc_folder for date_str in dates]
+            # Extend month-level column lists day by day; the CSV below is
+            # written straight from these, no frame in between
+            month_cols: Dict[str, list] = {k: [] for k in ["Date"] + _COLUMNS}
+            # executor.map preserves date order, keeping the output deterministic
+            for date_str, cols in zip(dates, executor.map(process_day, day_dirs, [doc_code] * len(dates))):
+                if cols:
+                    # add date column for traceability
+                    month_cols["Date"].extend([date_str] * len(cols["Name"]))
+                    for k in _COLUMNS:
+                        month_cols[k].extend(cols[k])
+
+            # Plain csv.writer over the column lists: the rows are strings
+            # and small numbers, so there is nothing for pandas' per-cell
+            # formatting to add, and no frame needs materializing at all
+            with open(out_csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(month_cols.keys())
+                writer.writerows(zip(*month_cols.values()))
+            print(f"Wrote {len(month_cols['Date'])} rows -> {out_csv}")
 
 if __name__ == "__main__":
     main()
@@ -3,66 +3,101 @@ HTML parsing module for AnyWho search results.
 """
 
 import re
+from itertools import islice
 from typing import Dict, Any, List, Optional, Set
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
-from src.processors.data_processor import normalize_phone, extract_phones_from_text
-from src.processors.data_processor import is_likely_name, is_likely_address
-from src.config.settings import PHONE_PATTERNS
+# Restrict parsing to the tags the extraction strategies actually look at;
+# lxml then skips materializing scripts, styles, meta and the rest of the
+# page chrome, which cuts both parse time and tree memory
+_STRAINER = SoupStrainer(['div', 'li', 'article', 'section',
+                          'h1', 'h2', 'h3', 'h4', 'address', 'strong', 'b', 'a'])
 
-def parse_anywho_results(html: str) -> List[Dict[str, Any]]:
+from src.processors.data_processor import extract_phones_from_text
+from src.processors.data_processor import is_likely_name, is_likely_address
+from src.config.settings import PHONE_REGEX
+
+# Curated result-container selectors, cheapest and most specific first
+_RESULT_SELECTORS = [
+    'div[class*="result"]',
+    'div[class*="listing"]',
+    'div[class*="person"]',
+    'div[class*="contact"]',
+    'div[class*="profile"]',
+    'li[class*="result"]',
+    'article[class*="person"]',
+    'section[class*="result"]',
+]
+
+# Stop collecting once this many phone-bearing candidates are found;
+# scoring only ever surfaces the top few
+_MAX_CANDIDATES = 10
+
+# Loose phone shape for text-node scans, compiled once at import
+_RE_PHONE_TEXT = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# Card-section and heading patterns, compiled once at module scope; these
+# run on every card of every page, so skip the per-call cache lookup
+_RE_PHONE_HDR = re.compile(r'PHONE\s+NUMBER\(S\):', re.IGNORECASE)
+_RE_LIVES_IN = re.compile(r'LIVES\s+IN:', re.IGNORECASE)
+_RE_USED_TO = re.compile(r'USED\s+TO\s+LIVE\s+IN:', re.IGNORECASE)
+_RE_AGE = re.compile(r'Age\s+(\d+)', re.IGNORECASE)
+_RE_AGE_SUB = re.compile(r',?\s*Age\s+\d+', re.IGNORECASE)
+_RE_PHONE_PAT = re.compile(r'\d{3}.*\d{3}.*\d{4}')
+
+# Section labels observed on profile cards, upper-cased once here. A single
+# alternation pass locates every label position per card instead of one
+# str.find sweep per label per section (see build_label_index below).
+_SECTION_LABELS = (
+    'PHONE NUMBER(S):', 'LIVES IN:', 'USED TO LIVE IN:', 'EMAILS:',
+    'MAY BE RELATED TO:', 'SOCIAL PROFILES:', 'AKA:', 'RESULTS', 'SUMMARY',
+)
+_RE_SECTION_LABELS = re.compile('|'.join(re.escape(l) for l in _SECTION_LABELS))
+
+# RESULTS/SUMMARY are page chrome that only bounds the phone section; the
+# address/AKA sections keep the narrower label set they always used
+_PHONE_BOUND_LABELS = frozenset(_SECTION_LABELS)
+_CARD_BOUND_LABELS = _PHONE_BOUND_LABELS - {'RESULTS', 'SUMMARY'}
+
+def _quick_textlen(node, limit: int) -> int:
+    """Sum descendant text lengths, stopping once limit is reached.
+
+    A cheap proxy for len(get_text()) that avoids walking and joining the
+    whole subtree just to discard a too-small node.
+    """
+    n = 0
+    for s in node.strings:
+        n += len(s)
+        if n >= limit:
+            break
+    return n
+
+def parse_anywho_results(html) -> List[Dict[str, Any]]:
     """Enhanced parsing of AnyWho search results with comprehensive CSS selectors"""
     if not html:
         return []
 
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml', parse_only=_STRAINER)
     candidates = []
 
-    # Strategy 1: Comprehensive CSS selectors for AnyWho profiles
-    result_selectors = [
-        # Common AnyWho patterns
-        'div[class*="result"]',
-        'div[class*="listing"]',
-        'div[class*="person"]',
-        'div[class*="contact"]',
-        'div[class*="profile"]',
-        'li[class*="result"]',
-        'article[class*="person"]',
-        'section[class*="result"]',
-
-        # Specific AnyWho classes that might exist
-        '.result-item',
-        '.person-result',
-        '.listing-result',
-        '.contact-result',
-        '.profile-card',
-        '.person-card',
-        '.contact-card',
-
-        # Data attributes
-        '[data-person]',
-        '[data-result]',
-        '[data-contact]',
-        '[data-profile]',
-
-        # Generic containers that might hold person data
-        'div:has(h1,h2,h3,h4,strong,b)',  # Any div with headings
-        'div:has(phone,a[href*="tel"])',  # Divs with phone links
-
-        # Look for any div that contains both a name-like element and phone
-        'div:has([class*="name"]),div:has(h1,h2,h3,h4,strong,b)',
-
-        # Very broad fallback - any div with substantial text content
-        'div:not([class]):not([id])',  # Plain divs
-    ]
-
-    for selector in result_selectors:
+    # Strategy 1: curated CSS selectors for AnyWho profiles. The old list
+    # also carried :has() pseudo-selectors (unsupported, always raised) and
+    # catch-alls like div:not([class]):not([id]) that matched most of the
+    # page; those cost a full scan each without finding anything the
+    # substring-class selectors below miss.
+    # Nodes matched by several substring-class selectors (e.g. a div whose
+    # class hits both "result" and "person") are parsed only once
+    seen_nodes = set()
+    for selector in _RESULT_SELECTORS:
         try:
             results = soup.select(selector)
             for result in results:
-                # Skip very small or empty elements
-                text_content = result.get_text(' ', strip=True)
-                if len(text_content) < 20:
+                if id(result) in seen_nodes:
+                    continue
+                seen_nodes.add(id(result))
+                # Skip very small or empty elements without materializing
+                # the full subtree text
+                if _quick_textlen(result, 20) < 20:
                     continue
 
                 candidate = parse_result_block(result)
@@ -70,22 +105,33 @@ def parse_anywho_results(html: str) -> List[Dict[str, Any]]:
                     candidates.append(candidate)
         except Exception:
             continue
-
-    # Strategy 2: If still no candidates, try phone element walk-up
+        # Enough candidates to rank; skip the remaining selectors
+        if len(candidates) >= _MAX_CANDIDATES:
+            break
+
+    # Strategy 2: If still no candidates, try phone element walk-up. One
+    # generator pass over the text nodes with the precompiled regex replaces
+    # find_all(text=re.compile(...)); parents are deduped by id() so phone
+    # numbers sharing a container are only parsed once.
     if not candidates:
-        phone_elements = soup.find_all(text=re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'))
-
-        for phone_elem in phone_elements:
-            container = phone_elem.parent
+        seen_parents = set()
+        for text_node in soup.strings:
+            if not _RE_PHONE_TEXT.search(text_node):
+                continue
+            container = text_node.parent
             for _ in range(5):
-                if container and container.name in ['div', 'li', 'article', 'section']:
-                    text_content = container.get_text(' ', strip=True)
-                    if len(text_content) > 30:
-                        candidate = parse_result_block(container)
-                        if candidate and candidate.get('phone'):
-                            candidates.append(candidate)
-                        break
-                container = container.parent if container else None
+                if container is None:
+                    break
+                if container.name in ('div', 'li', 'article', 'section'):
+                    if id(container) not in seen_parents:
+                        seen_parents.add(id(container))
+                        text_content = container.get_text(' ', strip=True)
+                        if len(text_content) > 30:
+                            candidate = parse_result_block(container)
+                            if candidate and candidate.get('phone'):
+                                candidates.append(candidate)
+                    break
+                container = container.parent
 
     # Strategy 3: Text-based fallback
     if not candidates:
@@ -112,19 +158,24 @@ def find_profile_cards(soup: BeautifulSoup) -> List[Any]:
     cards: List[Any] = []
     seen: Set[int] = set()
 
+    def _climb(node, levels, stop_names=('html', 'body')):
+        # Take up to `levels` ancestors off the .parents generator, never
+        # stepping into a stop tag; replaces the branch-per-level walk
+        for parent in islice(node.parents, levels):
+            if parent.name in stop_names:
+                break
+            node = parent
+        return node
+
     # Strategy 1: Find elements containing the phone numbers header
-    header_elems = soup.find_all(string=re.compile(r"PHONE\s+NUMBER\(S\):", re.IGNORECASE))
+    header_elems = soup.find_all(string=_RE_PHONE_HDR)
 
     for header in header_elems:
         container = getattr(header, 'parent', None)
         if container:
-            for level in range(4):
-                if container and container.parent and container.parent.name not in ('html', 'body'):
-                    container = container.parent
-                else:
-                    break
+            container = _climb(container, 4)
 
-            if container is not None and id(container) not in seen:
+            if id(container) not in seen:
                 container_text = container.get_text(' ', strip=True)
                 if len(container_text) > 50 and len(container_text) < 10000:
                     seen.add(id(container))
@@ -132,18 +183,14 @@ def find_profile_cards(soup: BeautifulSoup) -> List[Any]:
 
     # Strategy 2: Look for other profile indicators if no cards found yet
     if not cards:
-        lives_elems = soup.find_all(string=re.compile(r"LIVES\s+IN:", re.IGNORECASE))
+        lives_elems = soup.find_all(string=_RE_LIVES_IN)
 
         for lives_header in lives_elems:
             container = getattr(lives_header, 'parent', None)
             if container:
-                for level in range(4):
-                    if container and container.parent and container.parent.name not in ('html', 'body'):
-                        container = container.parent
-                    else:
-                        break
+                container = _climb(container, 4)
 
-                if container and id(container) not in seen:
+                if id(container) not in seen:
                     container_text = container.get_text(' ', strip=True)
                     if len(container_text) > 50:
                         seen.add(id(container))
@@ -154,81 +201,68 @@ def find_profile_cards(soup: BeautifulSoup) -> List[Any]:
         name_headings = soup.find_all(['h1', 'h2', 'h3', 'h4'])
         for heading in name_headings:
             heading_text = heading.get_text(' ', strip=True)
-            if (re.search(r'Age\s+\d+', heading_text, re.IGNORECASE) or
+            if (_RE_AGE.search(heading_text) or
                 len(heading_text.split()) >= 2):
 
                 container = heading.parent
-                for level in range(3):
-                    if container and container.parent:
-                        container = container.parent
-                    else:
-                        break
+                if container is not None:
+                    # No stop tags here: the old walk climbed unconditionally
+                    container = _climb(container, 3, stop_names=())
 
                 if container and id(container) not in seen:
                     container_text = container.get_text(' ', strip=True)
                     if (len(container_text) > 50 and
-                        re.search(r'\d{3}.*\d{3}.*\d{4}', container_text)):
+                        _RE_PHONE_PAT.search(container_text)):
                         seen.add(id(container))
                         cards.append(container)
 
     return cards
 
-def _extract_section_text(card_text: str, start_label: str, labels: List[str]) -> str:
-    """Extract text between a start label and the next label from the list.
+def build_label_index(text_upper: str) -> List[tuple]:
+    """Locate every section label in one pass over the upper-cased card text.
 
-    The search is done in a case-insensitive way on the full card text.
+    Returns (start, end, label) tuples in document order; the section
+    extractors slice against this index instead of each re-scanning the
+    card with str.find per label.
     """
-    text_upper = card_text.upper()
-    start_upper = start_label.upper()
-    start_idx = text_upper.find(start_upper)
-    if start_idx == -1:
-        return ""
-
-    # Find the next section label after start
-    next_indices = []
-    for label in labels:
-        idx = text_upper.find(label.upper(), start_idx + len(start_upper))
-        if idx != -1:
-            next_indices.append(idx)
-
-    end_idx = min(next_indices) if next_indices else len(card_text)
-    return card_text[start_idx + len(start_upper):end_idx].strip()
-
-def extract_phone_section(card_element) -> List[str]:
-    """Extract phone numbers exclusively from the PHONE NUMBER(S): section."""
-    card_text = card_element.get_text('\n', strip=True)
-    # Labels observed on cards; used to bound sections
-    labels = [
-        'PHONE NUMBER(S):', 'LIVES IN:', 'USED TO LIVE IN:', 'EMAILS:',
-        'MAY BE RELATED TO:', 'SOCIAL PROFILES:', 'AKA:', 'RESULTS', 'SUMMARY'
-    ]
+    return [(m.start(), m.end(), m.group(0))
+            for m in _RE_SECTION_LABELS.finditer(text_upper)]
+
+def _extract_section_text(card_text: str, label_index: List[tuple],
+                          start_label: str, bound_labels: frozenset) -> str:
+    """Extract text between a start label and the next bounding label."""
+    for i, (start_idx, start_end, label) in enumerate(label_index):
+        if label != start_label:
+            continue
+        end_idx = len(card_text)
+        for next_start, _, next_label in label_index[i + 1:]:
+            if next_label in bound_labels:
+                end_idx = next_start
+                break
+        return card_text[start_end:end_idx].strip()
+    return ""
 
-    phone_block = _extract_section_text(card_text, 'PHONE NUMBER(S):', labels)
+def extract_phone_section(card_text: str, label_index: List[tuple]) -> List[str]:
+    """Extract phone numbers exclusively from the PHONE NUMBER(S): section."""
+    phone_block = _extract_section_text(card_text, label_index,
+                                        'PHONE NUMBER(S):', _PHONE_BOUND_LABELS)
     if not phone_block:
         return []
 
-    # Extract phone numbers within the bounded phone section only
-    phones: Set[str] = set()
-    for pattern in PHONE_PATTERNS:
-        matches = pattern.findall(phone_block)
-        for match in matches:
-            digits = ''.join(match) if isinstance(match, tuple) else match
-            norm = normalize_phone(digits)
-            if norm:
-                phones.add(norm)
+    # One unified-alternation pass over the bounded phone section; the
+    # shared helper normalizes and dedupes the matches
+    return extract_phones_from_text(phone_block, PHONE_REGEX)
 
-    return list(phones)
-
-def extract_name_age(card_element) -> Dict[str, Any]:
+def extract_name_age(card_element, card_text: str) -> Dict[str, Any]:
     """Extract name and age from the top of the card if present."""
     # Prefer heading tags
     for tag in ['h1', 'h2', 'h3']:
         heading = card_element.find(tag)
         if heading:
             text = heading.get_text(' ', strip=True)
-            age_match = re.search(r'Age\s+(\d+)', text, re.IGNORECASE)
+            age_match = _RE_AGE.search(text)
             return {
-                'name': re.sub(r'\,?\s*Age\s+\d+', '', text, flags=re.IGNORECASE).strip(),
+                'name': _RE_AGE_SUB.sub('', text).strip(),
                 'age': age_match.group(1) if age_match else ''
             }
 
@@ -236,39 +270,33 @@ def extract_name_age(card_element) -> Dict[str, Any]:
     strong = card_element.find(['strong', 'b'])
     if strong:
         text = strong.get_text(' ', strip=True)
-        age_match = re.search(r'Age\s+(\d+)', text, re.IGNORECASE)
+        age_match = _RE_AGE.search(text)
         return {
-            'name': re.sub(r'\,?\s*Age\s+\d+', '', text, flags=re.IGNORECASE).strip(),
+            'name': _RE_AGE_SUB.sub('', text).strip(),
             'age': age_match.group(1) if age_match else ''
         }
 
     # Final fallback: first line
-    first_line = card_element.get_text('\n', strip=True).split('\n', 1)[0]
-    age_match = re.search(r'Age\s+(\d+)', first_line, re.IGNORECASE)
+    first_line = card_text.split('\n', 1)[0]
+    age_match = _RE_AGE.search(first_line)
     return {
-        'name': re.sub(r'\,?\s*Age\s+\d+', '', first_line, flags=re.IGNORECASE).strip(),
+        'name': _RE_AGE_SUB.sub('', first_line).strip(),
         'age': age_match.group(1) if age_match else ''
     }
 
-def extract_address_section(card_element) -> List[str]:
+def extract_address_section(card_text: str, label_index: List[tuple]) -> List[str]:
     """Extract ALL addresses from both LIVES IN and USED TO LIVE IN sections."""
     addresses = []
 
-    card_text = card_element.get_text('\n', strip=True)
-    labels = [
-        'PHONE NUMBER(S):', 'LIVES IN:', 'USED TO LIVE IN:', 'EMAILS:',
-        'MAY BE RELATED TO:', 'SOCIAL PROFILES:', 'AKA:'
-    ]
-
     # Extract current address
-    current_block = _extract_section_text(card_text, 'LIVES IN:', labels)
+    current_block = _extract_section_text(card_text, label_index, 'LIVES IN:', _CARD_BOUND_LABELS)
     if current_block:
         current_addr = current_block.split('\n')[0].strip()
         if current_addr:
             addresses.append(current_addr)
 
     # Extract previous addresses
-    prev_block = _extract_section_text(card_text, 'USED TO LIVE IN:', labels)
+    prev_block = _extract_section_text(card_text, label_index, 'USED TO LIVE IN:', _CARD_BOUND_LABELS)
     if prev_block:
         # Split on bullets (•) and clean up
         prev_addresses = re.split(r'\s*•\s*|\n', prev_block)
@@ -279,41 +307,45 @@ def extract_address_section(card_element) -> List[str]:
 
     return addresses
 
-def extract_aka_section(card_element) -> List[str]:
+def extract_aka_section(card_text: str, label_index: List[tuple]) -> List[str]:
     """Extract AKA names from the card if present."""
-    card_text = card_element.get_text('\n', strip=True)
-    labels = [
-        'PHONE NUMBER(S):', 'LIVES IN:', 'USED TO LIVE IN:', 'EMAILS:',
-        'MAY BE RELATED TO:', 'SOCIAL PROFILES:', 'AKA:'
-    ]
-    aka_block = _extract_section_text(card_text, 'AKA:', labels)
+    aka_block = _extract_section_text(card_text, label_index, 'AKA:', _CARD_BOUND_LABELS)
     if not aka_block:
         return []
     # Split on bullets or separators
     parts = re.split(r'\s+•\s+|\s{2,}|,\s*', aka_block)
     return [p.strip() for p in parts if len(p.strip()) >= 3][:10]
 
-def validate_profile_card(card_element) -> bool:
-    """Basic validation to ensure this is a person profile card."""
-    text = card_element.get_text(' ', strip=True)
-    return (
-        re.search(r'PHONE\s+NUMBER\(S\):', text, re.IGNORECASE) is not None and
-        (re.search(r'LIVES\s+IN:', text, re.IGNORECASE) is not None or
-         re.search(r'USED\s+TO\s+LIVE\s+IN:', text, re.IGNORECASE) is not None)
-    )
+def validate_profile_card(label_index: List[tuple]) -> bool:
+    """Basic validation to ensure this is a person profile card.
+
+    Works off the card's label index, so validation costs a set build over
+    the handful of label hits instead of extra regex passes over the text.
+    """
+    labels_present = {label for _, _, label in label_index}
+    return ('PHONE NUMBER(S):' in labels_present and
+            ('LIVES IN:' in labels_present or
+             'USED TO LIVE IN:' in labels_present))
 
 def extract_profile_data(card, name_variant: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Extract structured candidate data from a profile card."""
-    if not validate_profile_card(card):
+    # One subtree traversal and one uppercase per card; every extractor
+    # below works on these shared strings instead of re-walking the DOM
+    # One uppercase and one label sweep per card; validation and every
+    # section extractor work off the shared index instead of re-scanning
+    card_text = card.get_text('\n', strip=True)
+    label_index = build_label_index(card_text.upper())
+
+    if not validate_profile_card(label_index):
         return None
 
-    phones = extract_phone_section(card)
+    phones = extract_phone_section(card_text, label_index)
     if not phones:
         return None
 
-    name_age = extract_name_age(card)
-    addresses = extract_address_section(card)
-    aka_names = extract_aka_section(card)
+    name_age = extract_name_age(card, card_text)
+    addresses = extract_address_section(card_text, label_index)
+    aka_names = extract_aka_section(card_text, label_index)
 
     # Filter out JavaScript/React code masquerading as names
     name = name_age.get('name', '')
@@ -327,16 +359,21 @@ def extract_profile_data(card, name_variant: Dict[str, Any]) -> Optional[Dict[st
         'phone': phones[0],
         'all_phones': phones,
         'aka': aka_names,
-        'raw_text': card.get_text(' ', strip=True)[:500],
+        'raw_text': card_text.replace('\n', ' ')[:500],
         'search_variant': name_variant.get('variant_type', 'basic')
     }
 
-def parse_profile_cards(html: str, name_variant: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Parse the response HTML focusing on profile cards and phone section."""
+def parse_profile_cards(html, name_variant: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Parse the response HTML focusing on profile cards and phone section.
+
+    Accepts the raw response bytes as well as decoded text; lxml detects the
+    encoding itself in C, so handing it bytes skips a full decode-and-copy
+    of the document per response.
+    """
     if not html:
         return []
 
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml', parse_only=_STRAINER)
     candidates: List[Dict[str, Any]] = []
 
     # Method 1: Find profile cards with PHONE NUMBER(S) headers
@@ -356,7 +393,7 @@ def parse_profile_cards(html: str, name_variant: Dict[str, Any]) -> List[Dict[st
 
     # Method 4: Ultimate fallback - scan for any phone numbers and try to associate with names
     if not candidates:
-        candidates = parse_ultimate_fallback(html)
+        candidates = parse_ultimate_fallback(soup)
 
     return candidates
 
@@ -366,7 +403,7 @@ def parse_result_block(block) -> Optional[Dict[str, Any]]:
         block_text = block.get_text(' ', strip=True)
 
         # Extract phones from this block
-        phones = extract_phones_from_text(block_text, PHONE_PATTERNS)
+        phones = extract_phones_from_text(block_text, PHONE_REGEX)
         if not phones:
             return None
 
@@ -458,7 +495,7 @@ def parse_text_based_results(soup) -> List[Dict[str, Any]]:
 
     # Find all text nodes with phone numbers
     all_text = soup.get_text('\n', strip=True)
-    phones = extract_phones_from_text(all_text, PHONE_PATTERNS)
+    phones = extract_phones_from_text(all_text, PHONE_REGEX)
 
     if not phones:
         return candidates
@@ -466,7 +503,7 @@ def parse_text_based_results(soup) -> List[Dict[str, Any]]:
     # Try to find context around each phone number
     lines = all_text.split('\n')
     for i, line in enumerate(lines):
-        line_phones = extract_phones_from_text(line, PHONE_PATTERNS)
+        line_phones = extract_phones_from_text(line, PHONE_REGEX)
         if line_phones:
             # Look for name in nearby lines
             context_lines = lines[max(0, i-2):i+3]
@@ -492,18 +529,17 @@ def parse_text_based_results(soup) -> List[Dict[str, Any]]:
 
     return candidates
 
-def parse_ultimate_fallback(html: str) -> List[Dict[str, Any]]:
-    """Ultimate fallback: scan entire HTML for any phone/name combinations"""
-    candidates = []
-
-    if not html:
-        return candidates
+def parse_ultimate_fallback(soup) -> List[Dict[str, Any]]:
+    """Ultimate fallback: scan the already-parsed page for any phone/name combinations.
 
-    soup = BeautifulSoup(html, 'html.parser')
+    Takes the soup the caller parsed rather than re-building a second DOM
+    from the same HTML string.
+    """
+    candidates = []
 
     # Extract all phone numbers from the entire page
     all_text = soup.get_text(' ', strip=True)
-    all_phones = extract_phones_from_text(all_text, PHONE_PATTERNS)
+    all_phones = extract_phones_from_text(all_text, PHONE_REGEX)
 
     if not all_phones:
         return candidates
@@ -517,7 +553,7 @@ def parse_ultimate_fallback(html: str) -> List[Dict[str, Any]]:
         if not block:
             continue
 
-        block_phones = extract_phones_from_text(block, PHONE_PATTERNS)
+        block_phones = extract_phones_from_text(block, PHONE_REGEX)
         if not block_phones:
             continue
 
@@ -2,16 +2,50 @@
 Data processing module for name, address, and phone normalization.
 """
 
+import functools
 import re
+import sys
 from typing import Dict, Any, List, Optional, Set
 
+from src.config.settings import is_common_first_name
+from src.processors.patterns import NON_DIGIT as _NON_DIGIT
+from src.processors.patterns import DEL_NON_DIGIT as _DEL_NON_DIGIT
+
+# Compiled once at import: these run per candidate/per record, and calling
+# .sub/.search on the compiled object skips the re-cache probe per call
+_NAME_CLEAN = re.compile(r'[^\w\s]')
+_ADDR_CLEAN = re.compile(r'[^\w\s#]')
+_STREET_NUM = re.compile(r'\b(\d+)\b')
+_HAS_DIGIT = re.compile(r'\d')
+# Single alternations so one left-to-right scan answers the membership
+# question instead of one search per sub-pattern
+_AVOID_UNION = re.compile(
+    r'\d+'                               # Contains numbers
+    r'|phone|call|contact|email|@'        # Contact-related words
+    r'|street|ave|blvd|rd|dr|ct|ln'       # Address words
+)
+_ADDR_UNION = re.compile(
+    r'\b\d{1,5}\s+[A-Z]'                 # Street number followed by letter
+    r'|\b(?:ST|AVE|AVENUE|BLVD|BOULEVARD|DR|DRIVE|RD|ROAD|CT|COURT'
+    r'|LN|LANE|PL|PLACE|WAY|STREET|COURT)\b'
+    r'|\bFL\b|\bFLORIDA\b|\bMIAMI\b'    # Location indicators
+)
+
 def normalize_phone(phone_str: str) -> Optional[str]:
     """Extract and normalize phone number to (XXX) XXX-XXXX format"""
     if not phone_str:
         return None
     
-    # Remove all non-digit characters for initial processing
-    digits = re.sub(r'\D', '', phone_str)
+    # Fast path: already-clean digit strings (the common case for phone
+    # fields fed back through the pipeline) skip extraction entirely
+    if phone_str.isascii() and phone_str.isdigit():
+        digits = phone_str
+    else:
+        # Remove all non-digit characters; translate handles the ASCII
+        # common case, the regex catches anything exotic
+        digits = phone_str.translate(_DEL_NON_DIGIT)
+        if digits and not (digits.isascii() and digits.isdigit()):
+            digits = _NON_DIGIT.sub('', phone_str)
     
     # Must be exactly 10 digits for US phone numbers
     if len(digits) != 10:
@@ -20,35 +54,37 @@ def normalize_phone(phone_str: str) -> Optional[str]:
     # Format as (XXX) XXX-XXXX
     return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
 
-def extract_phones_from_text(text: str, phone_patterns: List[re.Pattern]) -> List[str]:
-    """Extract all valid phone numbers from text using multiple patterns"""
+def extract_phones_from_text(text: str, phone_regex: re.Pattern) -> List[str]:
+    """Extract all valid phone numbers from text in one regex pass"""
     phones = set()
-    
-    for pattern in phone_patterns:
-        matches = pattern.findall(text)
-        for match in matches:
-            if isinstance(match, tuple):
-                # Join the groups
-                phone_digits = ''.join(match)
-            else:
-                phone_digits = match
-            
-            normalized = normalize_phone(phone_digits)
-            if normalized:
-                phones.add(normalized)
-    
+
+    # Bind the method once so the loop avoids repeated attribute lookups
+    finditer = phone_regex.finditer
+    for match in finditer(text):
+        # The whole match is the phone text; translate strips separators in
+        # one pass, so no group-joining or normalize_phone call per hit
+        digits = match.group(0).translate(_DEL_NON_DIGIT)
+        if len(digits) == 10 and digits.isdigit():
+            phones.add(f"({digits[:3]}) {digits[3:6]}-{digits[6:]}")
+
     return list(phones)
 
+# The same names and addresses come back repeatedly (retry paths, candidate
+# lists, re-runs over overlapping row ranges), so both normalizers memoize on
+# the raw input string. Callers treat the returned dicts as read-only, which
+# every current consumer already does.
+@functools.lru_cache(maxsize=8192)
 def normalize_name(name: str) -> Dict[str, Any]:
-    """Enhanced name normalization with middle name detection"""
+    """Enhanced name normalization with middle name detection; memoized,
+    so the returned dict must not be mutated"""
     if not name:
         return {
             "first": "", "middle": "", "last": "",
             "full": "", "has_middle": False,
-            "middle_initial": "", "search_variants": []
+            "middle_initial": "", "first_core": "", "search_variants": []
         }
 
-    cleaned = re.sub(r'[^\w\s]', ' ', name.upper().strip())
+    cleaned = _NAME_CLEAN.sub(' ', name.upper().strip())
     parts = [p for p in cleaned.split() if len(p) > 1]
 
     result = {
@@ -70,6 +106,22 @@ def normalize_name(name: str) -> Dict[str, Any]:
         # Handle compound names like ESTRADA CASTRO MARTHA
         result = handle_compound_names(parts)
 
+    # Grouping core of the first name: strip a trailing single-letter
+    # initial (e.g. "RAFAEL P" -> "RAFAEL") once here so per-candidate
+    # grouping doesn't have to re-split the string
+    first = result["first"]
+    if ' ' in first:
+        head, _, tail = first.rpartition(' ')
+        result["first_core"] = head if len(tail) == 1 else first
+    else:
+        result["first_core"] = first
+
+    # Intern the grouping fields: the same names recur across thousands of
+    # candidates, so interning dedupes the strings and makes the tuple-key
+    # comparisons in grouping pointer-fast
+    for key in ("first", "last", "middle_initial", "first_core"):
+        result[key] = sys.intern(result[key])
+
     # Generate search variants (only basic and middle initial, skip full middle)
     result["search_variants"] = generate_name_variants(result)
 
@@ -86,6 +138,10 @@ def detect_name_format(parts: List[str]) -> Dict[str, Any]:
     # 1. If second part is 1 character, likely middle initial in LAST FIRST MIDDLE format (e.g., "SPENCER WARREN J")
     # 2. If first part is common first name, likely FIRST MIDDLE LAST format
     # 3. Default to LAST FIRST MIDDLE if ambiguous
+    #
+    # The membership probe is O(1) against the shared COMMON_FIRST_NAMES
+    # frozenset; growing the lexicon (e.g. loading census first names into
+    # settings) changes accuracy but not the cost of this classification.
 
     if len(parts[1]) == 1:
         # Likely LAST FIRST MIDDLE format (e.g., "SPENCER WARREN J")
@@ -95,16 +151,9 @@ def detect_name_format(parts: List[str]) -> Dict[str, Any]:
         result["has_middle"] = True
         result["middle_initial"] = parts[2]  # Middle initial is the third part
     else:
-        # Check if first part looks like a first name
-        common_first_names = {'JOHN', 'JAMES', 'MICHAEL', 'MARY', 'PATRICIA', 'LINDA', 'BARBARA',
-                             'ELIZABETH', 'JENNIFER', 'MARIA', 'SUSAN', 'MARGARET', 'DOROTHY',
-                             'LISA', 'NANCY', 'KAREN', 'BETTY', 'HELEN', 'SANDRA', 'DONNA',
-                             'ROBERT', 'WILLIAM', 'DAVID', 'RICHARD', 'CHARLES', 'JOSEPH',
-                             'THOMAS', 'CHRISTOPHER', 'DANIEL', 'MATTHEW', 'ANTHONY', 'MARK',
-                             'DONALD', 'STEVEN', 'PAUL', 'ANDREW', 'JOSHUA', 'KENNETH', 'KEVIN',
-                             'BRIAN', 'GEORGE', 'TIMOTHY', 'RONALD', 'JASON', 'EDWARD', 'JACOB'}
-
-        if parts[0] in common_first_names:
+        # Check if first part looks like a first name (shared helper keeps
+        # the lookup-name heuristic in one place alongside the lexicon)
+        if is_common_first_name(parts[0]):
             # Likely FIRST MIDDLE LAST format
             result["first"] = parts[0]
             result["middle"] = parts[1]
@@ -173,28 +222,46 @@ def generate_name_variants(name_dict: Dict[str, Any]) -> List[Dict[str, str]]:
 
     return variants
 
+# Street words excluded from "meaningful" token matching in address scoring
+_MEANINGFUL_STOPWORDS = frozenset({'st', 'ave', 'blvd', 'dr', 'rd', 'ct', 'ln', 'pl', 'way', 'n', 's', 'e', 'w'})
+
+# Directionals and street types excluded from the street-name key
+_STREET_STOPWORDS = frozenset({'N', 'S', 'E', 'W', 'ST', 'AVE', 'BLVD', 'DR', 'RD', 'CT', 'LN', 'PL', 'WAY'})
+
+@functools.lru_cache(maxsize=8192)
 def normalize_address(addr: str) -> Dict[str, Any]:
-    """Parse and normalize address components"""
+    """Parse and normalize address components; memoized, so the returned
+    dict must not be mutated"""
     if not addr:
-        return {"raw": "", "tokens": set(), "street_num": "", "street_name": ""}
-    
-    cleaned = re.sub(r'[^\w\s#]', ' ', addr.upper().strip())
-    tokens = set(p for p in cleaned.split() if len(p) > 1)
-    
+        return {
+            "raw": "", "tokens": set(), "street_num": "", "street_name": "",
+            "tokens_sorted": (), "n_tokens": 0, "tokens_meaningful": frozenset()
+        }
+
+    cleaned = _ADDR_CLEAN.sub(' ', addr.upper().strip())
+
     # Extract street number (first sequence of digits)
-    street_num_match = re.search(r'\b(\d+)\b', cleaned)
+    street_num_match = _STREET_NUM.search(cleaned)
     street_num = street_num_match.group(1) if street_num_match else ""
-    
-    # Extract street name (remove common directionals and types)
-    street_tokens = tokens - {'N', 'S', 'E', 'W', 'ST', 'AVE', 'BLVD', 'DR', 'RD', 'CT', 'LN', 'PL', 'WAY'}
-    if street_num:
-        street_tokens.discard(street_num)
-    
+
+    tokens = {p for p in cleaned.split() if len(p) > 1}
+    # Street-name tokens are a subset of the full set, so filtering the
+    # already-sorted tuple keeps them in canonical order for free; one
+    # sort per address instead of two, and no intermediate subset set
+    tokens_sorted = tuple(sorted(tokens))
+
     return {
         "raw": addr.strip(),
         "tokens": tokens,
         "street_num": street_num,
-        "street_name": ' '.join(sorted(street_tokens)) if street_tokens else ""
+        "street_name": ' '.join(t for t in tokens_sorted
+                                if t not in _STREET_STOPWORDS and t != street_num),
+        # Precomputed views for the address scoring hot path: sorted tuple
+        # enables allocation-free two-pointer intersection, cached length
+        # avoids recount, and the meaningful set is pre-filtered once
+        "tokens_sorted": tokens_sorted,
+        "n_tokens": len(tokens),
+        "tokens_meaningful": frozenset(t.lower() for t in tokens if len(t) > 2 and t.lower() not in _MEANINGFUL_STOPWORDS)
     }
 
 def is_likely_name(text: str) -> bool:
@@ -212,18 +279,7 @@ def is_likely_name(text: str) -> bool:
         return False
     
     # Avoid common non-name patterns
-    avoid_patterns = [
-        r'\d+',  # Contains numbers
-        r'(phone|call|contact|email|@)',  # Contact-related words
-        r'(street|ave|blvd|rd|dr|ct|ln)',  # Address words
-    ]
-    
-    text_lower = text.lower()
-    for pattern in avoid_patterns:
-        if re.search(pattern, text_lower):
-            return False
-    
-    return True
+    return _AVOID_UNION.search(text.lower()) is None
 
 def is_likely_address(text: str) -> bool:
     """Determine if text looks like an address"""
@@ -233,19 +289,8 @@ def is_likely_address(text: str) -> bool:
     text_upper = text.upper()
     
     # Must contain at least one digit (street number)
-    if not re.search(r'\d', text):
+    if not _HAS_DIGIT.search(text):
         return False
     
     # Should contain common address components
-    address_indicators = [
-        r'\b\d{1,5}\s+[A-Z]',  # Street number followed by letter
-        r'\b(ST|AVE|AVENUE|BLVD|BOULEVARD|DR|DRIVE|RD|ROAD|CT|COURT|LN|LANE|PL|PLACE|WAY)\b',
-        r'\b(STREET|DRIVE|ROAD|COURT|LANE|PLACE)\b',
-        r'\bFL\b|\bFLORIDA\b|\bMIAMI\b',  # Location indicators
-    ]
-    
-    for pattern in address_indicators:
-        if re.search(pattern, text_upper):
-            return True
-    
-    return False
+    return _ADDR_UNION.search(text_upper) is not None
@@ -0,0 +1,18 @@
+"""
+Compiled pattern singletons shared by the processing modules.
+
+data_processor and phone_cleaner each grew their own non-digit stripper;
+keeping the compiled objects here means one compile at import for all
+callers, and gives a single place to swap the engine later if needed.
+"""
+
+import re
+
+# Non-digit matchers for phone normalization fallbacks
+NON_DIGIT = re.compile(r'\D')
+NON_DIGIT_RUN = re.compile(r'\D+')
+
+# ASCII deletion table: str.translate strips phone formatting in one C
+# pass; the regexes above remain the fallback for non-ASCII input
+DEL_NON_DIGIT = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not chr(c).isdigit()))
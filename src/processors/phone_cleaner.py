@@ -3,8 +3,18 @@ import re
 from pathlib import Path
 from typing import Iterable, List
 
+import numpy as np
 import pandas as pd
 
+# Shared compiled singletons; the fallback import keeps this file runnable
+# as a standalone script (the GUI invokes it by path)
+try:
+    from src.processors.patterns import NON_DIGIT_RUN as _NON_DIGIT
+    from src.processors.patterns import DEL_NON_DIGIT as _DEL_NON_DIGIT
+except ImportError:
+    from patterns import NON_DIGIT_RUN as _NON_DIGIT
+    from patterns import DEL_NON_DIGIT as _DEL_NON_DIGIT
+
 
 DEFAULT_PHONE_COLUMNS: List[str] = ["Phone1", "Phone2", "Phone3", "Phone4"]
 DROP_COLUMNS: List[str] = [
@@ -24,7 +34,7 @@ DROP_COLUMNS: List[str] = [
 ]
 
 # Tokens that should not be considered a first name when scanning from the end
-CONNECTOR_TOKENS = {
+CONNECTOR_TOKENS = frozenset({
     "de",
     "del",
     "la",
@@ -37,9 +47,13 @@ CONNECTOR_TOKENS = {
     "von",
     "di",
     "le",
-}
+})
+
+SUFFIX_TOKENS = frozenset({"jr", "jr.", "sr", "sr.", "ii", "iii", "iv", "v", "vi"})
 
-SUFFIX_TOKENS = {"jr", "jr.", "sr", "sr.", "ii", "iii", "iv", "v", "vi"}
+# Edge punctuation stripped from name tokens (hoisted so the hot loop
+# doesn't re-materialize the literal per token)
+_PUNCT_STRIP = ".,;:()[]{}'\""
 
 
 def normalize_phone(value: object) -> str:
@@ -56,7 +70,14 @@ def normalize_phone(value: object) -> str:
     if text == "" or text.lower() in {"nan", "none", "null"}:
         return ""
 
-    digits = re.sub(r"\D+", "", text)
+    # Fast path: already-clean digit strings (most Phone cells after a
+    # previous pass) skip extraction and go straight to prefixing
+    if text.isascii() and text.isdigit():
+        digits = text
+    else:
+        digits = text.translate(_DEL_NON_DIGIT)
+        if digits and not (digits.isascii() and digits.isdigit()):
+            digits = _NON_DIGIT.sub("", text)
     if digits == "":
         return ""
 
@@ -82,7 +103,10 @@ def extract_first_name(value: object) -> str:
 
     tokens = text.split()
     for raw in reversed(tokens):
-        token = raw.strip(".,;:()[]{}'\"")
+        # Most tokens are clean letters; only strip when punctuation can
+        # actually be present. Stripping stays edge-only on purpose so
+        # interior punctuation (O'BRIEN, J.R.) survives.
+        token = raw if raw.isalpha() else raw.strip(_PUNCT_STRIP)
         lower = token.lower()
         if lower == "":
             continue
@@ -98,10 +122,17 @@ def extract_first_name(value: object) -> str:
 
 
 def clean_phone_columns(input_csv: Path, output_csv: Path, columns: Iterable[str]) -> None:
-    """Read a CSV, clean phone columns, reduce Name to first name, drop extra columns, write to output CSV."""
-    df = pd.read_csv(input_csv, dtype=str)
-    # Preserve original row order to keep split phone rows adjacent per person
-    df["_row_order"] = range(len(df))
+    """Read a CSV, clean phone columns, reduce Name to first name, drop extra columns, write to output CSV.
+
+    Output rows keep each person's phones adjacent in original input order
+    by construction (the reshape interleaves the phone columns directly).
+    """
+    # Skim just the header so the dropped-column report still covers
+    # everything in the file, then load only the columns the pipeline
+    # uses; the rest never enter memory at all
+    header = pd.read_csv(input_csv, nrows=0).columns
+    needed = {"Name", *columns}
+    df = pd.read_csv(input_csv, dtype=str, usecols=lambda c: c in needed)
 
     present_columns = [c for c in columns if c in df.columns]
     missing_columns = [c for c in columns if c not in df.columns]
@@ -112,21 +143,32 @@ def clean_phone_columns(input_csv: Path, output_csv: Path, columns: Iterable[str
         )
 
     for col in present_columns:
-        df[col] = df[col].map(normalize_phone)
+        # Vectorized equivalent of normalize_phone: the null-token blanking,
+        # digit stripping and '1' prefixing all run as pandas string kernels
+        # instead of a Python call per cell
+        s = df[col].fillna("").astype(str).str.strip()
+        s = s.where(~s.str.lower().isin(("nan", "none", "null")), "")
+        d = s.str.replace(r"\D+", "", regex=True)
+        df[col] = d.where(d.str.startswith("1") | (d == ""), "1" + d)
 
     if missing_columns:
         print(f"[warn] Missing columns (skipped): {missing_columns}")
 
-    # Transform Name -> first name (Title Case)
+    # Transform Name -> first name (Title Case). Names repeat heavily
+    # before deduplication, so extract once per distinct value and map the
+    # results back instead of calling the extractor per row
     if "Name" in df.columns:
-        df["Name"] = df["Name"].map(extract_first_name)
+        names = df["Name"]
+        df["Name"] = names.map({v: extract_first_name(v) for v in names.unique()})
     else:
         print("[warn] Missing column 'Name' (skipped first-name extraction)")
 
-    # Drop non-required columns if present (keeps Phone1/Phone2 for reshaping)
-    to_drop_present = [c for c in DROP_COLUMNS if c in df.columns]
+    # Most non-required columns were filtered at read time; the report
+    # still lists every one present in the file, and the phone columns
+    # that were cleaned but not kept (Phone3/Phone4) are shed here
+    to_drop_present = [c for c in DROP_COLUMNS if c in header]
     if to_drop_present:
-        df.drop(columns=to_drop_present, inplace=True)
+        df.drop(columns=[c for c in to_drop_present if c in df.columns], inplace=True)
         print(f"[info] Dropped columns: {to_drop_present}")
 
     # Reshape Phone1/Phone2 into single 'Phone' column, duplicating rows per person
@@ -135,30 +177,24 @@ def clean_phone_columns(input_csv: Path, output_csv: Path, columns: Iterable[str
         # If neither Phone1 nor Phone2 exist after drops, write empty with schema
         df_out = pd.DataFrame(columns=["Name", "Phone"]) if "Name" in df.columns else pd.DataFrame(columns=["Phone"])
     else:
-        id_vars = ["Name", "_row_order"] if "Name" in df.columns else ["_row_order"]
-        long_df = pd.melt(
-            df,
-            id_vars=id_vars,
-            value_vars=phone_value_columns,
-            var_name="_phone_source",
-            value_name="Phone",
-        )
-
-        # Remove empty phones
-        long_df["Phone"] = long_df["Phone"].fillna("").astype(str)
-        long_df = long_df[long_df["Phone"] != ""]
-
-        # Remove duplicate phone numbers globally
-        long_df.drop_duplicates(subset="Phone", inplace=True)
-
-        # Sort to keep per-person phone entries adjacent in original input order
-        long_df.sort_values(by=["_row_order", "_phone_source"], inplace=True, kind="stable")
-
-        # Final output order
-        if "Name" in long_df.columns:
-            df_out = long_df[["Name", "Phone"]]
+        # Interleave the phone columns directly: writing Phone1/Phone2 into
+        # alternating slots of one array is already the desired per-person
+        # adjacency, so the old melt + row-order sort (and its _row_order
+        # bookkeeping column) fall away entirely
+        k = len(phone_value_columns)
+        phones = np.empty(len(df) * k, dtype=object)
+        for i, col in enumerate(phone_value_columns):
+            phones[i::k] = df[col].to_numpy()
+
+        phone_series = pd.Series(phones).fillna("").astype(str)
+        # Keep non-empty phones, first occurrence wins for duplicates
+        keep = (phone_series != "") & ~phone_series.duplicated()
+
+        if "Name" in df.columns:
+            names = np.repeat(df["Name"].to_numpy(), k)
+            df_out = pd.DataFrame({"Name": names[keep.to_numpy()], "Phone": phone_series[keep]})
         else:
-            df_out = long_df[["Phone"]]
+            df_out = pd.DataFrame({"Phone": phone_series[keep]})
 
     # Write output
     output_csv.parent.mkdir(parents=True, exist_ok=True)
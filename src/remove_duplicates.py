@@ -8,17 +8,70 @@ Additionally, it removes rows where names contain business-related terms.
 
 Usage:
     python remove_duplicates.py input.csv [output.csv]
+    python remove_duplicates.py --manifest pairs.json
 
 If no output file is specified, it will create a backup and overwrite the input file.
+The manifest form takes a JSON list of [input, output] pairs and processes them all
+in one interpreter, so multi-month runs don't pay Python/pandas startup per file.
 """
 
+import numpy as np
 import pandas as pd
 import sys
 import os
 import re
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 
+# Business terms to filter out (case-insensitive substring match; the old
+# list carried several duplicates, removed here). Compiled into a single
+# alternation so one scan per name replaces a Python loop over every term.
+BUSINESS_TERMS = (
+    'LLC', 'INC', 'CORP', 'LLP', 'BANK', 'N.A.', 'TRUST', 'FUND',
+    'CAPITAL', 'MORTGAGE', 'COMPANY', 'ASSOCIATION', 'PRODUCTS',
+    'EVERGREEN', 'LP', 'REGISTRATION', 'UNION', 'NBA', 'PROPERTIES',
+    'LOANS', 'URBAN', 'FINANCIAL', 'HOME', 'FINANCE', 'INVESTMENTS',
+    'DEVELOPMENT', 'DEBT', 'CORPORATION', 'LTD', 'SERVICES', 'MIAMI',
+)
+
+
+def _build_term_pattern(terms):
+    """Factor the terms into a prefix-sharing alternation via a trie.
+
+    A flat alternation makes the regex engine retry every branch at each
+    position; sharing common prefixes (CORP/CORPORATION, FINANCE/FINANCIAL,
+    LLC/LLP/LP...) the way an Aho-Corasick automaton would keeps the branch
+    count proportional to distinct prefixes, so the scan stays near-linear
+    as the term list grows. This also keeps the pattern compatible with
+    stdlib re, which Series.str.contains requires; a DFA engine such as
+    re2 would need the filter to leave pandas' C path.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = None  # terminal marker
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child)
+                    for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        terminal = '' in node
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if terminal else '')
+
+    return emit(trie)
+
+
+_BIZ_RE = re.compile(_build_term_pattern(BUSINESS_TERMS), re.IGNORECASE)
+
+
 def contains_business_terms(name):
     """
     Check if a name contains business-related terms that should be filtered out.
@@ -31,25 +84,7 @@ def contains_business_terms(name):
     """
     if pd.isna(name) or not isinstance(name, str):
         return False
-    
-    # Business terms to filter out (case-insensitive)
-    business_terms = [
-        'LLC', 'INC', 'CORP', 'LLP', 'BANK', 'N.A.', 'TRUST', 'FUND', 
-        'CAPITAL', 'MORTGAGE', 'COMPANY', 'ASSOCIATION', 'PRODUCTS',
-        'EVERGREEN', 'LP', 'REGISTRATION', 'UNION', 'NBA', 'PROPERTIES', 'LOANS','URBAN','FINANCIAL','HOME',
-        'FINANCE','INVESTMENTS','DEVELOPMENT','DEBT','CAPITAL','FINANCE','INVESTMENTS','DEVELOPMENT','DEBT','CAPITAL',
-        'CORPORATION', 'MORTGAGE', 'LTD', 'SERVICES', 'MIAMI'
-    ]
-    
-    # Convert to uppercase for case-insensitive matching
-    name_upper = name.upper()
-    
-    # Check if any business term is contained in the name
-    for term in business_terms:
-        if term in name_upper:
-            return True
-    
-    return False
+    return _BIZ_RE.search(name) is not None
 
 
 def remove_duplicates_and_business_names(input_file, output_file=None):
@@ -64,57 +99,81 @@ def remove_duplicates_and_business_names(input_file, output_file=None):
         tuple: (original_count, deduplicated_count, removed_count, business_removed_count)
     """
     try:
-        # Read the CSV file
+        # Stream the file in chunks so peak memory is one chunk plus the
+        # seen-name set instead of three full copies of the frame. Cells
+        # are read as strings: everything except Name is passed through
+        # verbatim, so numeric inference would be wasted work (and a float
+        # round-trip for phone-like columns).
         print(f"Reading CSV file: {input_file}")
-        df = pd.read_csv(input_file)
-        
-        # Get original count
-        original_count = len(df)
-        print(f"Original row count: {original_count}")
-        
-        # Check if Name column exists
-        if 'Name' not in df.columns:
-            print("Error: 'Name' column not found in CSV file.")
-            print(f"Available columns: {list(df.columns)}")
-            return None, None, None, None
-        
-        # Remove business names first
-        print("Filtering out business names...")
-        df_filtered = df[~df['Name'].apply(contains_business_terms)]
-        business_removed_count = original_count - len(df_filtered)
-        print(f"Business names removed: {business_removed_count}")
-        
-        # Remove duplicates based on Name column, keeping first occurrence
-        print("Removing duplicates based on Name column...")
-        df_deduplicated = df_filtered.drop_duplicates(subset=['Name'], keep='first')
-        
-        # Get deduplicated count
-        deduplicated_count = len(df_deduplicated)
-        duplicate_removed_count = len(df_filtered) - deduplicated_count
-        total_removed_count = original_count - deduplicated_count
-        
-        print(f"Duplicate rows removed: {duplicate_removed_count}")
-        print(f"Rows after all processing: {deduplicated_count}")
-        print(f"Total rows removed: {total_removed_count}")
-        
-        # Determine output file
+        reader = pd.read_csv(input_file, dtype=str, chunksize=200_000)
+
         if output_file is None:
-            # Create backup of original file
+            # Byte-identical backup of the original, then rewrite in place
             backup_file = f"{input_file}.backup"
             print(f"Creating backup: {backup_file}")
-            df.to_csv(backup_file, index=False)
-            
-            # Overwrite original file
+            shutil.copyfile(input_file, backup_file)
             output_file = input_file
             print(f"Overwriting original file: {output_file}")
         else:
             print(f"Writing to output file: {output_file}")
-        
-        # Write deduplicated data
-        df_deduplicated.to_csv(output_file, index=False)
-        
+
+        print("Filtering business names and duplicates...")
+        original_count = 0
+        business_removed_count = 0
+        deduplicated_count = 0
+        seen_names = set()
+        first_chunk = True
+        # Kept rows are written to a sibling temp file and moved into place
+        # at the end, so an interrupted run never leaves a partial output
+        # (which matters for the overwrite-in-place path)
+        tmp_file = f"{output_file}.tmp"
+        with reader:
+            for chunk in reader:
+                if first_chunk and 'Name' not in chunk.columns:
+                    print("Error: 'Name' column not found in CSV file.")
+                    print(f"Available columns: {list(chunk.columns)}")
+                    return None, None, None, None
+
+                chunk_rows = len(chunk)
+                original_count += chunk_rows
+
+                # Business-name filter: one C scan with the alternation
+                chunk = chunk[~chunk['Name'].str.contains(_BIZ_RE, na=False)]
+                business_removed_count += chunk_rows - len(chunk)
+
+                # Cross-chunk dedupe: drop names already seen, then first
+                # occurrence within the chunk
+                fresh = chunk[~chunk['Name'].isin(seen_names)]
+                codes, _ = pd.factorize(fresh['Name'].to_numpy())
+                keep = np.zeros(len(codes), dtype=bool)
+                keep[np.unique(codes, return_index=True)[1]] = True
+                kept = fresh[keep]
+                seen_names.update(kept['Name'])
+
+                kept.to_csv(tmp_file, mode='w' if first_chunk else 'a',
+                            header=first_chunk, index=False)
+                deduplicated_count += len(kept)
+                first_chunk = False
+
+        if first_chunk:
+            # Zero-row input: validate the header and emit it unchanged
+            header_df = pd.read_csv(input_file, nrows=0)
+            if 'Name' not in header_df.columns:
+                print("Error: 'Name' column not found in CSV file.")
+                print(f"Available columns: {list(header_df.columns)}")
+                return None, None, None, None
+            header_df.to_csv(tmp_file, index=False)
+
+        os.replace(tmp_file, output_file)
+
+        total_removed_count = original_count - deduplicated_count
+        print(f"Original row count: {original_count}")
+        print(f"Business names removed: {business_removed_count}")
+        print(f"Rows after all processing: {deduplicated_count}")
+        print(f"Total rows removed: {total_removed_count}")
+
         return original_count, deduplicated_count, total_removed_count, business_removed_count
-        
+
     except FileNotFoundError:
         print(f"Error: File '{input_file}' not found.")
         return None, None, None, None
@@ -123,17 +182,65 @@ def remove_duplicates_and_business_names(input_file, output_file=None):
         return None, None, None, None
 
 
+def run_manifest(manifest_file):
+    """Process a JSON manifest of [input, output] pairs in one process."""
+    try:
+        pairs = json.loads(Path(manifest_file).read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"Error reading manifest '{manifest_file}': {e}")
+        sys.exit(1)
+
+    failures = 0
+    if len(pairs) == 1:
+        input_file, output_file = pairs[0]
+        result = remove_duplicates_and_business_names(input_file, output_file)
+        if result[0] is None:
+            failures += 1
+    else:
+        # Months are independent, so fan the files out across worker
+        # processes; aggregate dedupe time drops to roughly N/cores
+        workers = min(4, os.cpu_count() or 1, len(pairs))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(remove_duplicates_and_business_names, inp, outp): inp
+                for inp, outp in pairs
+            }
+            for future in as_completed(futures):
+                inp = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error processing {inp}: {e}")
+                    failures += 1
+                    continue
+                if result[0] is None:
+                    failures += 1
+
+    print(f"\nManifest complete: {len(pairs) - failures}/{len(pairs)} files processed")
+    if failures:
+        sys.exit(1)
+
+
 def main():
     """Main function to handle command line arguments and execute deduplication."""
     
     # Check command line arguments
     if len(sys.argv) < 2:
         print("Usage: python remove_duplicates.py input.csv [output.csv]")
+        print("       python remove_duplicates.py --manifest pairs.json")
         print("\nExamples:")
         print("  python remove_duplicates.py data.csv                    # Overwrite original")
         print("  python remove_duplicates.py data.csv clean_data.csv     # Save to new file")
         sys.exit(1)
-    
+
+    # Manifest mode: many input/output pairs, one interpreter startup
+    if sys.argv[1] == "--manifest":
+        if len(sys.argv) < 3:
+            print("Error: --manifest requires a JSON file path.")
+            sys.exit(1)
+        run_manifest(sys.argv[2])
+        return
+
     input_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
     
@@ -3,15 +3,29 @@ Web scraping module for AnyWho phone lookups.
 Enhanced with modern anti-detection measures.
 """
 
+import logging
+import pathlib
 import time
 import random
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from src.processors.data_processor import normalize_name, normalize_address
 from src.parsers.anywho_parser import parse_profile_cards
 from src.algorithms.scoring import select_top_two_groups_phones
-from src.config.settings import ANYWHO_PEOPLE, DEFAULT_USER_AGENT, DEFAULT_HEADERS, DEFAULT_REQUEST_TIMEOUT
+from src.utils.caching import load_cache, save_cache
+from src.config.settings import (
+    ANYWHO_PEOPLE, DEFAULT_USER_AGENT, DEFAULT_HEADERS, DEFAULT_REQUEST_TIMEOUT,
+    ANYWHO_RATE_PER_SEC, ANYWHO_RATE_BURST, ACCEPT_ENCODING, DEFAULT_URL_CACHE_PATH,
+)
+
+# Per-URL chatter goes through the logger at DEBUG with deferred %s
+# formatting: at the default INFO level the messages are never even
+# formatted, and no stdout write serializes the lookup threads
+logger = logging.getLogger("anywho_scraper")
 
 # Modern user agents (updated for 2024)
 MODERN_USER_AGENTS = [
@@ -27,13 +41,8 @@ def get_random_user_agent() -> str:
     """Get a random modern user agent"""
     return random.choice(MODERN_USER_AGENTS)
 
-def build_enhanced_session(ua: Optional[str] = None, initialize_session: bool = True) -> requests.Session:
-    """Create session with realistic browser headers and Cloudflare bypass measures"""
-    s = requests.Session()
-
-    # Use random modern user agent if not specified
-    user_agent = ua or get_random_user_agent()
-
+def _build_headers_for(user_agent: str) -> Dict[str, str]:
+    """Build the full browser header set (with matching Sec-Ch-Ua) for a UA"""
     # Generate realistic Sec-Ch-Ua values based on user agent
     chrome_version = "131"
     if "Chrome/130" in user_agent:
@@ -42,18 +51,18 @@ def build_enhanced_session(ua: Optional[str] = None, initialize_session: bool =
         chrome_version = "129"
 
     # Enhanced headers with Cloudflare bypass measures
-    headers = {
+    return {
         "User-Agent": user_agent,
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
         "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": ACCEPT_ENCODING,
         "Connection": "keep-alive",
         "Upgrade-Insecure-Requests": "1",
         "Sec-Fetch-Dest": "document",
         "Sec-Fetch-Mode": "navigate",
         "Sec-Fetch-Site": "none",
         "Sec-Fetch-User": "?1",
-        f'Sec-Ch-Ua': f'"Google Chrome";v="{chrome_version}", "Chromium";v="{chrome_version}", "Not_A Brand";v="24"',
+        "Sec-Ch-Ua": f'"Google Chrome";v="{chrome_version}", "Chromium";v="{chrome_version}", "Not_A Brand";v="24"',
         "Sec-Ch-Ua-Mobile": "?0",
         "Sec-Ch-Ua-Platform": '"Windows"',
         "Cache-Control": "max-age=0",
@@ -67,12 +76,43 @@ def build_enhanced_session(ua: Optional[str] = None, initialize_session: bool =
         "Referer": "https://www.google.com/",
     }
 
+# One ready-made header dict per known UA, built once at import; session
+# construction then picks a template instead of re-scanning the UA string
+# and reassembling the dict every time
+_UA_HEADER_TEMPLATES = tuple((ua, _build_headers_for(ua)) for ua in MODERN_USER_AGENTS)
+
+def get_random_user_agent_with_headers() -> Dict[str, str]:
+    """Get the precomputed header set for a random modern user agent"""
+    return random.choice(_UA_HEADER_TEMPLATES)[1]
+
+def build_enhanced_session(ua: Optional[str] = None, initialize_session: bool = True) -> requests.Session:
+    """Create session with realistic browser headers and Cloudflare bypass measures"""
+    s = requests.Session()
+
+    # Precomputed template for the known UAs; only a caller-supplied custom
+    # UA pays for header construction
+    headers = _build_headers_for(ua) if ua else get_random_user_agent_with_headers()
+
     s.headers.update(headers)
 
+    # Transient failures (including Cloudflare 403/429 bursts) retry in the
+    # transport layer with backoff, reusing the pooled TLS connection instead
+    # of a hand-rolled loop with a fresh handshake per attempt; pool sizing
+    # matches the CLI's lookup worker count (same approach as step1)
+    retry = Retry(
+        total=3,
+        backoff_factor=1.5,
+        backoff_jitter=0.5,
+        status_forcelist=[403, 429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    s.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+
     # Initialize session by visiting homepage first (like real browsers)
     if initialize_session:
         try:
-            print("  Initializing session by visiting AnyWho homepage...")
+            logger.info("  Initializing session by visiting AnyWho homepage...")
             # Visit homepage with search engine referer
             s.headers.update({"Referer": "https://www.google.com/search?q=phone+lookup"})
             home_response = s.get("https://www.anywho.com/", timeout=DEFAULT_REQUEST_TIMEOUT)
@@ -81,9 +121,9 @@ def build_enhanced_session(ua: Optional[str] = None, initialize_session: bool =
             # Small delay to look more human
             time.sleep(random.uniform(1.0, 2.0))
 
-            print("  Session initialized successfully")
+            logger.info("  Session initialized successfully")
         except Exception as e:
-            print(f"  Warning: Session initialization failed: {e}")
+            logger.warning("  Session initialization failed: %s", e)
 
     return s
 
@@ -91,12 +131,100 @@ def build_session(ua: Optional[str] = None) -> requests.Session:
     """Create session with realistic browser headers (legacy function for compatibility)"""
     return build_enhanced_session(ua)
 
+# Process-wide session: the homepage initialization and TLS handshake happen
+# once, and every lookup thereafter rides the adapter's connection pool.
+# requests/urllib3 speak HTTP/1.1 only, so parallelism comes from the pool's
+# keep-alive connections (one in-flight request each) rather than HTTP/2
+# stream multiplexing; moving to a multiplexing client would mean swapping
+# the HTTP stack wholesale
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Return the shared session, building (and initializing) it on first use.
+
+    The homepage GET at build time doubles as a warm-up: it resolves DNS and
+    completes the TLS handshake on a keep-alive connection that the pool then
+    reuses, so later lookups skip both. Name resolution beyond that is left
+    to the OS resolver cache; urllib3 offers no per-connector DNS cache to
+    configure. Only a persistent-403 reset pays the warm-up again, and a
+    fresh connection fingerprint is the point of that path.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = build_enhanced_session()
+        return _SESSION
+
+def reset_session() -> requests.Session:
+    """Replace the shared session; used when a 403 persists past adapter retries"""
+    global _SESSION
+    with _SESSION_LOCK:
+        _SESSION = build_enhanced_session()
+        return _SESSION
+
 def add_random_delay(base_delay: float = 1.0) -> float:
     """Add random delay to prevent detection"""
     delay = base_delay + random.uniform(0.5, 2.0)
     time.sleep(delay)
     return delay
 
+class RateLimiter:
+    """Token-bucket limiter shared by all lookup threads.
+
+    The old per-request jitter sleep paced every worker independently, so N
+    workers meant N-times-slower throughput than the host limit required. A
+    single bucket makes the limit host-wide: a worker proceeds immediately
+    when a token is available and sleeps only for the bucket's actual
+    shortfall, so concurrency adds throughput up to the configured rate
+    instead of each thread serving its own full delay window.
+    """
+
+    def __init__(self, rate: float = ANYWHO_RATE_PER_SEC, capacity: float = ANYWHO_RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+            self.tokens -= 1.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+_LIMITER = RateLimiter()
+
+# URL-level cache: validators (ETag/Last-Modified) plus the candidates last
+# parsed from each search URL. When the server honors the validators it
+# answers 304 with no body, and the parse is skipped along with the bytes.
+_URL_CACHE: Optional[Dict[str, Any]] = None
+_URL_CACHE_LOCK = threading.Lock()
+
+def _get_url_entry(url: str) -> Optional[Dict[str, Any]]:
+    global _URL_CACHE
+    with _URL_CACHE_LOCK:
+        if _URL_CACHE is None:
+            _URL_CACHE = load_cache(pathlib.Path(DEFAULT_URL_CACHE_PATH))
+        return _URL_CACHE.get(url)
+
+def _put_url_entry(url: str, entry: Dict[str, Any]) -> None:
+    with _URL_CACHE_LOCK:
+        if _URL_CACHE is not None:
+            _URL_CACHE[url] = entry
+
+def save_url_cache() -> None:
+    """Persist the URL-level conditional-GET cache (no-op if never loaded)"""
+    with _URL_CACHE_LOCK:
+        if _URL_CACHE is not None:
+            save_cache(_URL_CACHE, pathlib.Path(DEFAULT_URL_CACHE_PATH))
+
 def build_search_urls(name_dict: Dict[str, Any], base_url: str) -> List[Dict[str, str]]:
     """Build search URLs for each name variant"""
     urls = []
@@ -118,14 +246,26 @@ def build_search_urls(name_dict: Dict[str, Any], base_url: str) -> List[Dict[str
 
     return urls
 
-def enrich_name(session: requests.Session, name: str, addr: str, sleep_sec: float = 1.0) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], List[Dict[str, Any]]]:
-    """Enhanced enrichment function with multiple search variants and anti-detection measures"""
+def enrich_name(session: Optional[requests.Session] = None, name: str = "", addr: str = "",
+                sleep_sec: float = 1.0,
+                target_name: Optional[Dict[str, Any]] = None,
+                target_addr: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], List[Dict[str, Any]]]:
+    """Enhanced enrichment function with multiple search variants and anti-detection measures
+
+    Accepts pre-normalized target name/address dicts so callers that already
+    normalized the row (e.g. for cache keying) don't pay for it twice.
+    With session=None the shared process-wide session is used.
+    """
     if not name.strip():
         return None, None, None, None, []
+    if session is None:
+        session = get_session()
 
-    # Enhanced name normalization
-    target_name = normalize_name(name)
-    target_addr = normalize_address(addr)
+    # Enhanced name normalization (skipped when the caller passed it in)
+    if target_name is None:
+        target_name = normalize_name(name)
+    if target_addr is None:
+        target_addr = normalize_address(addr)
 
     if not target_name['search_variants']:
         return None, None, None, None, []
@@ -133,120 +273,137 @@ def enrich_name(session: requests.Session, name: str, addr: str, sleep_sec: floa
     all_candidates = []
     successful_variant = None
 
-    # Try each name variant in sequence (basic, then middle_initial)
-    for variant in target_name['search_variants']:
-        urls = build_search_urls(target_name, ANYWHO_PEOPLE)
-
-        for url_info in urls:
-            if url_info['variant_type'] != variant['variant_type']:
-                continue
-
-            try:
-                print(f"  Searching: {url_info['url']} ({url_info['variant_type']})")
-
-                # Add random delay before request
-                actual_delay = add_random_delay(sleep_sec)
-
-                # Update referer to the AnyWho homepage (now that we've visited it)
-                session.headers.update({"Referer": "https://www.anywho.com/"})
-
-                # Add some randomization to headers for each request
-                session.headers.update({
-                    "Sec-Fetch-Site": random.choice(["same-origin", "same-site"]),
-                    "Cache-Control": random.choice(["max-age=0", "no-cache"]),
-                })
-
-                response = session.get(url_info['url'], timeout=DEFAULT_REQUEST_TIMEOUT)
-                response.raise_for_status()
-
-                # Try multiple parsing strategies to find all candidates
-                candidates = parse_profile_cards(response.text, variant)
-
-                for candidate in candidates:
-                    candidate['search_variant'] = url_info['variant_type']
-                    candidate['search_url'] = url_info['url']
-
-                if candidates:
-                    all_candidates.extend(candidates)
-                    successful_variant = url_info['variant_type']
-                    print(f"    Found {len(candidates)} candidates with {url_info['variant_type']} variant")
-
-                # Additional delay between variant attempts
-                if sleep_sec > 0:
-                    time.sleep(sleep_sec * 0.5)
-
-            except Exception as e:
-                print(f"  Error with {url_info['variant_type']}: {e}")
-
-                # Enhanced 403 error handling with exponential backoff
-                if "403" in str(e):
-                    print(f"  Got 403 error, trying with fresh session and longer delay...")
-
-                    # Exponential backoff: wait longer before retry
-                    backoff_delay = sleep_sec * 3 + random.uniform(2.0, 5.0)
-                    print(f"  Backing off for {backoff_delay:.1f} seconds...")
-                    time.sleep(backoff_delay)
-
-                    # Try with completely fresh session
-                    fresh_session = build_enhanced_session()
-                    try:
-                        fresh_session.headers.update({"Referer": "https://www.anywho.com/"})
-                        response = fresh_session.get(url_info['url'], timeout=DEFAULT_REQUEST_TIMEOUT)
-                        response.raise_for_status()
-
-                        candidates = parse_profile_cards(response.text, variant)
-                        if candidates:
-                            all_candidates.extend(candidates)
-                            successful_variant = url_info['variant_type']
-                            print(f"    Found {len(candidates)} candidates with fresh session")
-                    except Exception as e2:
-                        print(f"  Fresh session also failed: {e2}")
-
-                        # If still failing, try one more time with different approach
-                        if "403" in str(e2):
-                            print("  Attempting final retry with different user agent and longer delay...")
-                            time.sleep(sleep_sec * 5)  # Even longer delay
-                            final_session = build_enhanced_session()
-                            try:
-                                final_session.headers.update({"Referer": "https://www.google.com/search?q=anywho+phone+lookup"})
-                                response = final_session.get(url_info['url'], timeout=DEFAULT_REQUEST_TIMEOUT)
-                                response.raise_for_status()
-
-                                candidates = parse_profile_cards(response.text, variant)
-                                if candidates:
-                                    all_candidates.extend(candidates)
-                                    successful_variant = url_info['variant_type']
-                                    print(f"    Found {len(candidates)} candidates with final retry")
-                            except Exception as e3:
-                                print(f"  Final retry also failed: {e3}")
-                continue
+    # Build the URL list once and group it by variant type up front; the
+    # old shape rebuilt the full list inside the variant loop and filtered
+    # most of it away again on every pass
+    urls_by_variant: Dict[str, List[Dict[str, str]]] = {}
+    for url_info in build_search_urls(target_name, ANYWHO_PEOPLE):
+        urls_by_variant.setdefault(url_info['variant_type'], []).append(url_info)
+
+    # One flat request plan per name: every (variant, url) pair the name
+    # needs, in order. The two variants share the aggregation into
+    # all_candidates anyway; overlapping them across threads here would
+    # only multiply the CLI pool's workers while the host-wide token
+    # bucket keeps total throughput fixed, so the flattening keeps the
+    # control flow single-level without nested fan-out
+    request_plan = [(variant, url_info)
+                    for variant in target_name['search_variants']
+                    for url_info in urls_by_variant.get(variant['variant_type'], [])]
+    for variant, url_info in request_plan:
+        try:
+            logger.debug("  Searching: %s (%s)", url_info['url'], url_info['variant_type'])
+
+            # Wait for a rate-limit token before hitting the host
+            actual_delay = _LIMITER.acquire()
+
+            # Per-request header overrides: the session is shared by the
+            # caller's worker threads, so mutating session.headers here
+            # would race and bleed between concurrent lookups. Referer is
+            # the AnyWho homepage (visited at session build), plus some
+            # per-request randomization.
+            req_headers = {
+                "Referer": "https://www.anywho.com/",
+                "Sec-Fetch-Site": random.choice(["same-origin", "same-site"]),
+                "Cache-Control": random.choice(["max-age=0", "no-cache"]),
+            }
+
+            # Conditional GET: replay the validators from the last fetch of
+            # this URL; a 304 answer carries no body and skips the parse
+            url_entry = _get_url_entry(url_info['url'])
+            if url_entry:
+                if url_entry.get('etag'):
+                    req_headers['If-None-Match'] = url_entry['etag']
+                if url_entry.get('last_modified'):
+                    req_headers['If-Modified-Since'] = url_entry['last_modified']
+
+            response = session.get(url_info['url'], headers=req_headers,
+                                   timeout=DEFAULT_REQUEST_TIMEOUT)
+            response.raise_for_status()
+
+            if response.status_code == 304 and url_entry is not None:
+                # Unchanged page: reuse the candidates parsed last time
+                # (copied, since callers annotate them in place)
+                candidates = [dict(c) for c in url_entry.get('candidates', [])]
+                logger.debug("  304 Not Modified, reusing %d cached candidates", len(candidates))
+            else:
+                # Try multiple parsing strategies to find all candidates.
+                # Parsing stays inline on the lookup thread: the token
+                # bucket caps the pipeline at roughly one page per second
+                # while a parse costs tens of milliseconds, so the GIL is
+                # never the bottleneck here, and shipping each page to a
+                # worker process would add pickling for no wall-time gain.
+                # Revisit only if ANYWHO_RATE_PER_SEC grows by an order of
+                # magnitude.
+                candidates = parse_profile_cards(response.content, variant)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    # Snapshot before annotation so the entry stays JSON-safe
+                    _put_url_entry(url_info['url'], {
+                        'etag': etag,
+                        'last_modified': last_modified,
+                        'candidates': [dict(c) for c in candidates],
+                    })
+
+            for candidate in candidates:
+                candidate['search_variant'] = url_info['variant_type']
+                candidate['search_url'] = url_info['url']
+
+            if candidates:
+                all_candidates.extend(candidates)
+                successful_variant = url_info['variant_type']
+                logger.debug("    Found %d candidates with %s variant", len(candidates), url_info['variant_type'])
+
+        except Exception as e:
+            logger.warning("  Error with %s: %s", url_info['variant_type'], e)
+
+            # The adapter already retried transient 403/429/5xx with
+            # backoff on the pooled connection; reaching here with a 403
+            # means it is persistent, so rebuild the shared session once
+            # (fresh UA, fresh cookies) and give the URL a final try
+            if "403" in str(e):
+                logger.warning("  Persistent 403, rebuilding session for a final retry...")
+
+                backoff_delay = sleep_sec * 3 + random.uniform(2.0, 5.0)
+                logger.warning("  Backing off for %.1f seconds...", backoff_delay)
+                time.sleep(backoff_delay)
+
+                session = reset_session()
+                try:
+                    response = session.get(url_info['url'],
+                                           headers={"Referer": "https://www.anywho.com/"},
+                                           timeout=DEFAULT_REQUEST_TIMEOUT)
+                    response.raise_for_status()
+
+                    candidates = parse_profile_cards(response.content, variant)
+                    if candidates:
+                        all_candidates.extend(candidates)
+                        successful_variant = url_info['variant_type']
+                        logger.debug("    Found %d candidates with fresh session", len(candidates))
+                except Exception as e2:
+                    logger.warning("  Fresh session also failed: %s", e2)
+            continue
 
     if not all_candidates:
-        print(f"  No candidates found for {name}")
+        logger.info("  No candidates found for %s", name)
         return None, None, None, None, []
 
-    print(f"  Found {len(all_candidates)} candidates total")
+    logger.info("  Found %d candidates total", len(all_candidates))
 
     # Select phones from top two person-groups
     phone1, phone2, phone3, phone4 = select_top_two_groups_phones(all_candidates, target_name, target_addr)
 
-    # Build final candidate list for visibility (top picks only)
-    final_candidates: List[Dict[str, Any]] = []
-    for cand in all_candidates:
-        if cand.get('phone') in {phone1, phone2, phone3, phone4}:
-            final_candidates.append(cand)
-
-    # Return primary two phones (backwards compatible), but stash others in candidates
-    # Downstream save logic will read Phone3/Phone4 from cache or context
-    # To maintain function signature, we return only first two; extra phones go in candidate metadata
-    for cand in final_candidates:
-        if cand.get('phone') == phone1:
-            cand['rank'] = 1
-        elif cand.get('phone') == phone2:
-            cand['rank'] = 2
-        elif cand.get('phone') == phone3:
-            cand['rank'] = 3
-        elif cand.get('phone') == phone4:
-            cand['rank'] = 4
+    # One phone->rank map replaces the four-way equality chain per candidate
+    rank_map = {p: i for i, p in enumerate((phone1, phone2, phone3, phone4), start=1) if p}
+
+    # Build the final candidate list (top picks only) and attach ranks in the
+    # same pass; filtering first and ranking second walked the list twice.
+    # Return primary two phones (backwards compatible), but stash others in
+    # candidates: downstream save logic reads Phone3/Phone4 from cache or
+    # context, so extra phones travel in candidate metadata.
+    final_candidates: List[Dict[str, Any]] = [
+        dict(cand, rank=rank_map[cand['phone']])
+        for cand in all_candidates if cand.get('phone') in rank_map
+    ]
 
     return phone1, phone2, phone3, phone4, final_candidates
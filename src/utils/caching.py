@@ -3,24 +3,77 @@ Caching utilities for storing and retrieving lookup results.
 """
 
 import json
+import os
 import pathlib
-from typing import Dict, Any
+from typing import Any, Dict
+
+# orjson parses and serializes the cache several times faster than stdlib
+# json; fall back to stdlib when it is not installed (same pattern as step1)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _journal_path(cache_path: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(f"{cache_path}.journal")
 
 def load_cache(cache_path: pathlib.Path) -> Dict[str, Any]:
-    """Load cached results"""
+    """Load cached results, folding in any journaled per-row updates"""
+    cache: Dict[str, Any] = {}
     if cache_path.exists():
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data = cache_path.read_bytes()
+            cache = orjson.loads(data) if orjson is not None else json.loads(data)
+        except Exception:
+            cache = {}
+    # Entries appended since the last full save live in the journal; later
+    # lines win, so replaying in order yields the freshest value per key
+    journal = _journal_path(cache_path)
+    if journal.exists():
+        try:
+            with open(journal, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        cache.update(orjson.loads(line) if orjson is not None
+                                     else json.loads(line))
         except Exception:
             pass
-    return {}
+    return cache
 
 def save_cache(cache: Dict[str, Any], cache_path: pathlib.Path):
-    """Save results to cache"""
+    """Save results to cache atomically, folding the journal into the base"""
     try:
         cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, indent=2, ensure_ascii=False)
+        # Write to a sibling temp file and swap it in, so a crash mid-write
+        # never leaves a truncated cache behind
+        tmp = pathlib.Path(f"{cache_path}.tmp")
+        if orjson is not None:
+            tmp.write_bytes(orjson.dumps(cache, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, cache_path)
+        # The base now contains everything the journal recorded
+        journal = _journal_path(cache_path)
+        if journal.exists():
+            journal.unlink()
     except Exception as e:
         print(f"Warning: Could not save cache: {e}")
+
+def append_cache_entry(key: str, value: Any, cache_path: pathlib.Path):
+    """Record one cache entry in the append-only journal.
+
+    A full save rewrites the whole file per update (O(N) in cache size);
+    appending a single JSON line is O(1), and load_cache merges the journal
+    back over the base on the next run.
+    """
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {key: value}
+        line = (orjson.dumps(entry) if orjson is not None
+                else json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        with open(_journal_path(cache_path), 'ab') as f:
+            f.write(line + b"\n")
+    except Exception as e:
+        print(f"Warning: Could not journal cache entry: {e}")
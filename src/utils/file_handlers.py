@@ -3,8 +3,46 @@ File handling utilities for CSV processing and dataframe operations.
 """
 
 import pathlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
 import pandas as pd
-from typing import Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class RowRangeSpec:
+    """Immutable snapshot of the row-range CLI arguments.
+
+    Built once after argument parsing; the range functions read plain slot
+    attributes instead of going through argparse.Namespace lookups on every
+    call, and the frozen spec cannot drift mid-run.
+    """
+    from_row: Optional[int] = None
+    to_row: Optional[int] = None
+    limit: Optional[int] = None
+    last: Optional[int] = None
+    start_row: int = 0
+    end_row: Optional[int] = None
+    max_rows: Optional[int] = None
+
+    @classmethod
+    def from_args(cls, args) -> "RowRangeSpec":
+        return cls(from_row=args.from_row, to_row=args.to_row,
+                   limit=args.limit, last=args.last,
+                   start_row=args.start_row, end_row=args.end_row,
+                   max_rows=args.max_rows)
+
+# Pass-through columns with few distinct values (a month of rows shares a
+# handful of dates and one or two doc types); held as category while the
+# frame is in memory so each cell is a small code instead of a str object.
+# Phone columns stay object - they are high-cardinality and get overwritten.
+_CATEGORY_COLUMNS = ('Date', 'Doc_Type_Code', 'Doc Type', 'Book_Type')
+
+def _compact_passthrough(df: pd.DataFrame) -> pd.DataFrame:
+    for col in _CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
 
 def load_or_create_enriched_df(output_path: str, input_df: pd.DataFrame) -> pd.DataFrame:
     """Load existing enriched CSV or create new one with phone columns"""
@@ -12,8 +50,12 @@ def load_or_create_enriched_df(output_path: str, input_df: pd.DataFrame) -> pd.D
 
     if output_path_obj.exists():
         try:
-            # Load existing enriched data
-            existing_df = pd.read_csv(output_path_obj)
+            # Load existing enriched data verbatim: every column is passed
+            # through or overwritten as text, so dtype inference is wasted
+            # work and would round-trip numeric-looking cells through float.
+            # keep_default_na=False keeps empty phone cells as '' (matching
+            # how the columns are initialized) instead of NaN.
+            existing_df = pd.read_csv(output_path_obj, dtype=str, keep_default_na=False)
             print(f"Loaded existing enriched data with {len(existing_df)} rows from {output_path}")
 
             # Ensure phone columns exist
@@ -26,7 +68,7 @@ def load_or_create_enriched_df(output_path: str, input_df: pd.DataFrame) -> pd.D
             if 'Phone4' not in existing_df.columns:
                 existing_df['Phone4'] = ''
 
-            return existing_df
+            return _compact_passthrough(existing_df)
         except Exception as e:
             print(f"Warning: Could not load existing enriched file ({e}). Creating new one.")
             # Fall through to create new dataframe
@@ -38,7 +80,7 @@ def load_or_create_enriched_df(output_path: str, input_df: pd.DataFrame) -> pd.D
     new_df['Phone3'] = ''
     new_df['Phone4'] = ''
     print(f"Created new enriched dataframe with {len(new_df)} rows")
-    return new_df
+    return _compact_passthrough(new_df)
 
 def update_enriched_df(existing_df: pd.DataFrame, input_df: pd.DataFrame,
                       start_idx: int, end_idx: int, total_processed: int) -> pd.DataFrame:
@@ -46,70 +88,70 @@ def update_enriched_df(existing_df: pd.DataFrame, input_df: pd.DataFrame,
     # Ensure we don't exceed the bounds of the existing dataframe
     max_idx = min(end_idx, len(existing_df), len(input_df))
 
-    updated_count = 0
-    for idx in range(start_idx, max_idx):
-        if idx < len(input_df) and idx < len(existing_df):
-            phone1_value = input_df.at[idx, 'Phone1'] if 'Phone1' in input_df.columns else ''
-            phone2_value = input_df.at[idx, 'Phone2'] if 'Phone2' in input_df.columns else ''
-            phone3_value = input_df.at[idx, 'Phone3'] if 'Phone3' in input_df.columns else ''
-            phone4_value = input_df.at[idx, 'Phone4'] if 'Phone4' in input_df.columns else ''
-
-            existing_df.at[idx, 'Phone1'] = phone1_value if phone1_value else pd.NA
-            existing_df.at[idx, 'Phone2'] = phone2_value if phone2_value else pd.NA
-            existing_df.at[idx, 'Phone3'] = phone3_value if phone3_value else pd.NA
-            existing_df.at[idx, 'Phone4'] = phone4_value if phone4_value else pd.NA
-            updated_count += 1
+    updated_count = max(0, max_idx - start_idx)
+    if updated_count:
+        # One vectorized slice assignment; the old per-row loop went through
+        # pandas' label indexing four times per row in pure Python. Blank
+        # cells (and missing source columns) become pd.NA as before.
+        cols = ['Phone1', 'Phone2', 'Phone3', 'Phone4']
+        vals = pd.DataFrame({
+            col: (input_df[col].iloc[start_idx:max_idx].to_numpy(dtype=object)
+                  if col in input_df.columns else [''] * updated_count)
+            for col in cols
+        })
+        vals = vals.where(vals.astype(bool), pd.NA)
+        existing_df.loc[existing_df.index[start_idx:max_idx], cols] = vals.to_numpy()
 
     print(f"Updated {updated_count} rows in enriched dataframe (processed range: {start_idx} to {max_idx-1})")
     return existing_df
 
-def calculate_row_range(df: pd.DataFrame, args) -> Tuple[int, int]:
+def calculate_row_range(df: pd.DataFrame, spec: RowRangeSpec) -> Tuple[int, int]:
     """Calculate start and end indices based on user arguments (human-friendly)"""
     total_rows = len(df)
 
     # Handle backward compatibility with old arguments
-    if not args.from_row and not args.to_row and not args.limit and not args.last:
+    if not spec.from_row and not spec.to_row and not spec.limit and not spec.last:
         # Use old arguments if new ones aren't specified
-        start_idx = args.start_row if args.start_row else 0
-        if args.end_row:
-            end_idx = min(args.end_row + 1, total_rows)  # Convert to exclusive end
-        elif args.max_rows:
-            end_idx = min(start_idx + args.max_rows, total_rows)
+        start_idx = spec.start_row if spec.start_row else 0
+        if spec.end_row:
+            end_idx = min(spec.end_row + 1, total_rows)  # Convert to exclusive end
+        elif spec.max_rows:
+            end_idx = min(start_idx + spec.max_rows, total_rows)
         else:
             end_idx = total_rows
         return start_idx, end_idx
 
     # Use new human-friendly arguments
     # Convert 1-based row numbers to 0-based indices
-    if args.from_row:
-        start_idx = max(0, args.from_row - 1)  # Convert to 0-based
+    if spec.from_row:
+        start_idx = max(0, spec.from_row - 1)  # Convert to 0-based
     else:
         start_idx = 0
 
-    if args.to_row:
-        end_idx = min(args.to_row, total_rows)  # Keep 1-based for user, but cap at total_rows
-    elif args.limit:
-        end_idx = min(start_idx + args.limit, total_rows)
-    elif args.last:
-        start_idx = max(0, total_rows - args.last)
+    if spec.to_row:
+        end_idx = min(spec.to_row, total_rows)  # Keep 1-based for user, but cap at total_rows
+    elif spec.limit:
+        end_idx = min(start_idx + spec.limit, total_rows)
+    elif spec.last:
+        start_idx = max(0, total_rows - spec.last)
         end_idx = total_rows
     else:
         end_idx = total_rows
 
     return start_idx, end_idx
 
-def validate_row_range(start_idx: int, end_idx: int, total_rows: int, args) -> bool:
+def validate_row_range(start_idx: int, end_idx: int, total_rows: int, spec: RowRangeSpec) -> bool:
     """Validate row range and provide user feedback"""
-    if args.from_row and args.from_row > total_rows:
-        print(f"Error: Starting row {args.from_row} exceeds file size ({total_rows})")
+    if spec.from_row and spec.from_row > total_rows:
+        print(f"Error: Starting row {spec.from_row} exceeds file size ({total_rows})")
         return False
 
-    if args.from_row and args.to_row and args.from_row > args.to_row:
-        print(f"Error: Starting row {args.from_row} cannot be greater than ending row {args.to_row}")
+    if spec.from_row and spec.to_row and spec.from_row > spec.to_row:
+        print(f"Error: Starting row {spec.from_row} cannot be greater than ending row {spec.to_row}")
         return False
 
-    if args.last and args.last > total_rows:
-        print(f"Error: Cannot process last {args.last} rows from file with only {total_rows} rows")
+    if spec.last and spec.last > total_rows:
+        print(f"Error: Cannot process last {spec.last} rows from file with only {total_rows} rows")
         return False
 
     if start_idx >= end_idx:
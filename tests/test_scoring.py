@@ -0,0 +1,36 @@
+"""Regression tests for candidate scoring."""
+
+from src.algorithms.scoring import (
+    _precompute_name_similarities,
+    select_top_two_groups_phones,
+)
+from src.processors.data_processor import normalize_address, normalize_name
+
+
+def test_empty_name_candidate_does_not_crash_selection():
+    """Fallback parsers can emit phone-only candidates with an empty name;
+    normalize_name('') leaves 'search_variants' present but empty, which used
+    to raise IndexError inside _precompute_name_similarities and kill the
+    whole enrichment call."""
+    target_name = normalize_name('SMITH JOHN A')
+    target_addr = normalize_address('123 MAIN ST MIAMI FL 33131')
+    candidates = [
+        {'name': 'JOHN SMITH', 'phone': '(305) 555-1234',
+         'address': '123 Main St, Miami, FL 33131'},
+        {'name': '', 'phone': '(305) 555-9999',
+         'address': '9 Oak Ave, Miami, FL 33139'},
+    ]
+
+    phones = select_top_two_groups_phones(candidates, target_name, target_addr)
+
+    assert len(phones) == 4
+    assert phones[0] == '(305) 555-1234'
+
+
+def test_precompute_handles_empty_target_name():
+    candidates = [{'name': 'JOHN SMITH', 'phone': '(305) 555-1234'}]
+
+    _precompute_name_similarities(normalize_name(''), candidates)
+
+    assert '_fuzz_full' in candidates[0]
+    assert '_fuzz_search' in candidates[0]